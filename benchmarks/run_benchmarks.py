@@ -0,0 +1,262 @@
+"""Micro-benchmarks for the capture, diff and PDF hot paths.
+
+Runs headless (offscreen Qt platform) and writes results as JSON so runs
+from different commits can be compared:
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --output new.json --compare bench.json
+
+Timings are the median of several repeats. Peak memory is measured in a
+separate, untimed run with tracemalloc, so it covers Python and numpy
+allocations but not memory allocated inside Qt.
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtGui import QImage
+
+from src.utils.image_utils import qimage_to_frame, compare_images
+from src.utils.change_detector import ChangeDetector
+from src.core.frame_sources import SyntheticFrameSource
+from src.core.pdf_compiler import PDFCompiler
+from src.core.ocr_backends import StubBackend
+
+REGION_SIZES = [(640, 480), (1280, 720), (1920, 1080), (2560, 1440), (3840, 2160), (5120, 2880)]
+DECK_SIZES = [10, 100]
+FULL_DECK_SIZES = [10, 100, 1000, 5000]
+IMAGES_PER_PAGE = [1, 2, 4]
+DECK_SLIDE_SIZE = (640, 360)
+
+def measure(func, repeats, setup=None):
+    """Median/min wall time over repeats plus the peak traced allocation of one extra run."""
+    times = []
+    for _ in range(repeats):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state)
+        times.append(time.perf_counter() - start)
+
+    state = setup() if setup else None
+    tracemalloc.start()
+    func(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "repeats": repeats,
+        "peak_bytes": peak,
+    }
+
+def make_qimage(width, height, seed=0):
+    """A BGRA QImage filled with a synthetic slide."""
+    rgb = SyntheticFrameSource(width, height, seed=seed).render_slide(0)
+    bgra = np.empty((height, width, 4), dtype=np.uint8)
+    bgra[:, :, :3] = rgb[:, :, ::-1]
+    bgra[:, :, 3] = 255
+    # copy() detaches the QImage from the numpy buffer
+    return QImage(bgra.tobytes(), width, height, width * 4, QImage.Format.Format_ARGB32).copy()
+
+def bench_screenshot_conversion(repeats):
+    results = []
+    for width, height in REGION_SIZES:
+        qimage = make_qimage(width, height)
+        stats = measure(lambda _: qimage_to_frame(qimage).to_image(), repeats)
+        results.append(("get_screenshot.qimage_to_pil", {"width": width, "height": height}, stats))
+    return results
+
+def bench_compare_images(repeats):
+    results = []
+    for width, height in REGION_SIZES:
+        source = SyntheticFrameSource(width, height)
+        base = source.render_slide(0)
+        frames = {
+            "identical": base.copy(),
+            "noise": np.clip(base.astype(np.int16) + 3, 0, 255).astype(np.uint8),
+            "new_slide": source.render_slide(1),
+        }
+        base_image = Image.fromarray(base)
+        for case, other in frames.items():
+            params = {"width": width, "height": height, "case": case}
+            # compare_images takes PIL images, so its numbers include the array conversion
+            other_image = Image.fromarray(other)
+            stats = measure(lambda _: compare_images(base_image, other_image), repeats)
+            results.append(("compare_images", params, stats))
+            detector = ChangeDetector()
+            stats = measure(lambda _: detector.is_different(base, other), repeats)
+            results.append(("change_detector.is_different", params, stats))
+            # Opt-in sampled estimate, for comparison with the exact default
+            sampled = ChangeDetector(levels=(16, 4))
+            stats = measure(lambda _: sampled.is_different(base, other), repeats)
+            results.append(("change_detector.sampled", params, stats))
+    return results
+
+def write_deck(directory, slides):
+    """Write a synthetic deck of PNGs and return their paths."""
+    source = SyntheticFrameSource(*DECK_SLIDE_SIZE, slides=slides, frames_per_slide=1)
+    source.open()
+    paths = []
+    for i in range(slides):
+        path = os.path.join(directory, f"screenshot_{i:06d}.png")
+        source.read().to_image().save(path)
+        paths.append(path)
+    return paths
+
+def bench_pdf(repeats, deck_sizes, ocr_backend=None):
+    """Time PDF compilation; with ocr_backend the text layer is written in the same pass."""
+    name = "pdf_compiler.run_generation" if ocr_backend is None else "pdf_compiler.searchable"
+    results = []
+    for slides in deck_sizes:
+        deck_dir = tempfile.mkdtemp(prefix="slidesnap_bench_deck_")
+        try:
+            paths = write_deck(deck_dir, slides)
+            for images_per_page in IMAGES_PER_PAGE:
+                out_dir = tempfile.mkdtemp(prefix="slidesnap_bench_pdf_")
+                try:
+                    def run(_):
+                        compiler = PDFCompiler()
+                        compiler.ocr_backend = ocr_backend
+                        messages = []
+                        compiler.finished.connect(messages.append)
+                        compiler.set_params(paths, images_per_page, out_dir)
+                        compiler.run_generation()
+                        if not messages or "Error" in messages[0]:
+                            raise RuntimeError(f"PDF generation failed: {messages}")
+                    # Very large decks take minutes per run; time them once
+                    stats = measure(run, repeats if slides <= 100 else 1)
+                    stats["pages_per_second"] = slides / images_per_page / stats["seconds"]
+                    params = {"slides": slides, "images_per_page": images_per_page,
+                              "slide_width": DECK_SLIDE_SIZE[0], "slide_height": DECK_SLIDE_SIZE[1]}
+                    results.append((name, params, stats))
+                finally:
+                    shutil.rmtree(out_dir, ignore_errors=True)
+        finally:
+            shutil.rmtree(deck_dir, ignore_errors=True)
+    return results
+
+# Cold-start commands, each run in a fresh interpreter from the repository root
+STARTUP_COMMANDS = {
+    "import_gui": ["-c", "import src.gui.main_window"],
+    "gui_window": ["-c", "from PyQt6.QtWidgets import QApplication; app = QApplication([]); "
+                         "from src.gui.main_window import MainWindow; MainWindow().show(); app.processEvents()"],
+    "cli_help": ["main.py", "--headless", "--help"],
+}
+
+def bench_startup(repeats):
+    """Wall time from interpreter launch to a shown window / parsed CLI, in subprocesses."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config_dir = tempfile.mkdtemp(prefix="slidesnap_bench_config_")
+    # Keep the window's QSettings away from the user's own
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", XDG_CONFIG_HOME=config_dir)
+    results = []
+    try:
+        for name, args in STARTUP_COMMANDS.items():
+            def run(_):
+                subprocess.run([sys.executable] + args, cwd=root, env=env, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run(None)
+                times.append(time.perf_counter() - start)
+            # Memory of the child is not traced
+            stats = {"seconds": statistics.median(times), "min_seconds": min(times),
+                     "repeats": repeats, "peak_bytes": 0}
+            results.append(("startup." + name, {}, stats))
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def result_key(entry):
+    return entry["name"] + json.dumps(entry["params"], sort_keys=True)
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {result_key(entry): entry for entry in json.load(f)["results"]}
+    print(f"\nComparison against {baseline_path} (ratio < 1.0 is faster):")
+    for entry in results:
+        old = baseline.get(result_key(entry))
+        if not old:
+            continue
+        ratio = entry["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        mem_ratio = entry["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else float("nan")
+        print(f"  {entry['name']:<32} {json.dumps(entry['params'], sort_keys=True):<70} "
+              f"time x{ratio:5.2f}  mem x{mem_ratio:5.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SlideSnap hot-path benchmarks")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file to write")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--full", action="store_true",
+                        help="Include 1,000 and 5,000 slide decks in the PDF benchmarks")
+    parser.add_argument("--only", choices=["screenshot", "compare", "pdf", "searchable", "startup"],
+                        action="append",
+                        help="Run only the named group (repeatable)")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    groups = args.only or ["screenshot", "compare", "pdf", "searchable", "startup"]
+
+    raw = []
+    if "screenshot" in groups:
+        raw += bench_screenshot_conversion(args.repeats)
+    if "compare" in groups:
+        raw += bench_compare_images(args.repeats)
+    if "pdf" in groups:
+        raw += bench_pdf(args.repeats, FULL_DECK_SIZES if args.full else DECK_SIZES)
+    if "searchable" in groups:
+        # The stub backend isolates the cost of the text layer from OCR itself
+        raw += bench_pdf(args.repeats, FULL_DECK_SIZES if args.full else DECK_SIZES, StubBackend())
+    if "startup" in groups:
+        raw += bench_startup(args.repeats)
+
+    results = []
+    for name, params, stats in raw:
+        entry = {"name": name, "params": params}
+        entry.update(stats)
+        results.append(entry)
+        print(f"{name:<32} {json.dumps(params, sort_keys=True):<70} "
+              f"{stats['seconds'] * 1000:10.2f} ms  peak {stats['peak_bytes'] / 1e6:8.2f} MB")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 import sys
 import os # Added for path joining
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QIcon # Added QIcon
-from src.gui.main_window import MainWindow
 
 def main():
+    if "--headless" in sys.argv[1:]:
+        # Command-line capture; imports only what a session needs
+        from src.cli import main as headless_main
+        sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QIcon # Added QIcon
     app = QApplication(sys.argv)
     
     # Set Application Name (for Dock, etc.)
@@ -19,6 +23,8 @@ def main():
     else:
         print(f"Warning: Icon file not found at {icon_path}")
 
+    # Imported after the application exists so startup cost is paid once, here
+    from src.gui.main_window import MainWindow
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
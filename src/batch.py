@@ -0,0 +1,253 @@
+import argparse
+import glob
+import os
+import queue
+import sys
+import time
+
+# Like the headless CLI, only the standard library is imported up front;
+# Qt, reportlab and the OCR stack load inside the worker processes.
+
+def find_sessions(paths):
+    """capture_* directories given directly or found one level below paths, in order."""
+    sessions = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.basename(path).startswith("capture_"):
+            candidates = [path]
+        else:
+            candidates = sorted(glob.glob(os.path.join(path, "capture_*")))
+        for directory in candidates:
+            if os.path.isdir(directory) and directory not in sessions:
+                sessions.append(directory)
+    return sessions
+
+def outputs_current(state, images_per_page, output_dir, ocr):
+    """Whether a journaled session already has the PDF a batch run would write."""
+    if state is None or not state.closed or not state.pdf_done:
+        return False
+    if images_per_page and images_per_page != state.images_per_page:
+        return False
+    if ocr and not state.ocr_done:
+        return False
+    output = state.ocr_path if state.ocr_done else state.pdf_path
+    if not output or not os.path.exists(output):
+        return False
+    return os.path.dirname(os.path.abspath(output)) == os.path.abspath(output_dir)
+
+def session_frames(directory, state):
+    """Frames to compile: the journal's, else loose screenshots or a session store.
+
+    Sessions moved since capture are found again by file name in directory.
+    """
+    from .utils.session_store import SessionStore, parse_ref
+    if state is not None and state.frames:
+        frames = []
+        for path in state.frames:
+            ref = parse_ref(path)
+            if not os.path.exists(ref[0] if ref else path):
+                path = os.path.join(directory, os.path.basename(path))
+            frames.append(path)
+        return frames
+    # Sessions from before the journal existed
+    frames = sorted(path for path in glob.glob(os.path.join(directory, "screenshot_*"))
+                    if path.lower().endswith((".png", ".jpg", ".jpeg")))
+    store_path = os.path.join(directory, "frames.ssn")
+    if os.path.exists(store_path):
+        store = SessionStore(store_path)
+        frames += [store.ref(i) for i in range(len(store))]
+        store.close()
+    return frames
+
+def compile_session(task):
+    """Compile (and OCR) one capture directory; runs in a pool worker process.
+
+    Progress is put on task["progress"] as (directory, percent) every 10%.
+    Returns a dict with the final status, page count and elapsed seconds.
+    """
+    from .core.pdf_compiler import PDFCompiler
+    from .core.ocr_processor import OCRProcessor
+    from .core.ocr_pool import OCRPool
+    from .core.ocr_backends import default_backend, get_backend
+    from .utils.journal import SessionJournal, load_journal
+    from .utils.ocr_cache import OCRCache
+    from .utils.search_index import SearchIndex
+
+    directory = task["directory"]
+    progress = task["progress"]
+    start = time.perf_counter()
+    state = load_journal(directory)
+    frames = session_frames(directory, state)
+    images_per_page = task["images_per_page"] or (state.images_per_page if state else 4)
+
+    compiler = PDFCompiler()
+    compiler.workers = 1  # Sessions are already spread over processes
+    compiler.set_params(frames, images_per_page, task["output_dir"], name=os.path.basename(directory))
+    journal = SessionJournal(directory)
+    compiler.set_journal(journal)
+    statuses = []
+    compiler.finished.connect(statuses.append)
+    last_step = [-1]
+
+    def report(percent):
+        if percent // 10 != last_step[0]:
+            last_step[0] = percent // 10
+            progress.put((directory, percent))
+    compiler.progress_updated.connect(report)
+
+    pool = cache = index = None
+    backend = None
+    if task["ocr"]:
+        backend = get_backend(task["backend"]) if task["backend"] else default_backend()
+    try:
+        if backend is not None:
+            if task["cache"]:
+                cache = OCRCache()
+            pool = OCRPool(workers=task["ocr_workers"], backend=backend, metrics=compiler.metrics, cache=cache)
+            pool.start()
+            compiler.set_ocr(pool)
+            if task["index"]:
+                index = SearchIndex()
+                compiler.set_search_index(index)
+        compiler.run_generation()
+        status = statuses[-1] if statuses else "Error: PDF generation did not finish."
+        # Without an OCR backend the finished PDF goes through ocrmypdf, as in the GUI
+        if task["ocr"] and status.startswith("PDF generated: "):
+            progress.put((directory, "OCR"))
+            pdf_path = status.split("PDF generated: ", 1)[1]
+            worker = OCRProcessor()
+            worker.set_metrics(compiler.metrics)
+            worker.set_journal(journal)
+            worker.jobs = task["ocr_workers"]
+            worker.set_params(pdf_path, os.path.join(os.path.dirname(pdf_path), f"OCR_{os.path.basename(pdf_path)}"))
+            worker.finished.connect(statuses.append)
+            worker.run_ocr()
+            status = statuses[-1]
+    except Exception as e:
+        status = f"Unexpected error: {e}"
+    finally:
+        for resource in (pool, cache, index):
+            if resource is not None:
+                resource.close()
+    journal.record("closed", status=status)
+    journal.close()
+    return {
+        "directory": directory,
+        "status": status,
+        "ok": not status.lower().startswith(("error", "unexpected error")),
+        "pages": compiler.metrics.snapshot()["counters"].get("pdf_pages", 0),
+        "seconds": time.perf_counter() - start,
+    }
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Recompile and OCR existing capture sessions in parallel. Each PATH is a "
+                    "capture_* directory or a directory containing them. Sessions whose PDF "
+                    "already matches the requested settings are skipped.")
+    parser.add_argument("paths", nargs="+", metavar="PATH")
+    parser.add_argument("--jobs", type=int, default=0, help="sessions compiled at once (0 = one per core)")
+    parser.add_argument("--images-per-page", type=int, choices=[1, 2, 4],
+                        help="page layout (default: the one each session was captured with)")
+    parser.add_argument("--output", help="directory for the PDFs (default: next to each capture directory)")
+    parser.add_argument("--no-ocr", action="store_true", help="write image-only PDFs")
+    parser.add_argument("--ocr-backend", help="OCR backend for the text layer (default: tesseract if installed, "
+                                              "otherwise OCRmyPDF on the finished PDF)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="OCR every frame again instead of reusing cached results")
+    parser.add_argument("--no-index", action="store_true", help="do not add the sessions to the slide search index")
+    parser.add_argument("--force", action="store_true", help="recompile sessions that are up to date")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sessions = find_sessions(args.paths)
+    if not sessions:
+        print("Error: No capture_* directories found.")
+        return 2
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    from concurrent.futures import ProcessPoolExecutor, wait
+    from multiprocessing import Manager
+    from .utils.journal import load_journal
+
+    cores = os.cpu_count() or 2
+    jobs = args.jobs or max(1, cores - 1)
+    manager = Manager()
+    progress = manager.Queue()
+    tasks = []
+    skipped = 0
+    for directory in sessions:
+        output_dir = args.output or os.path.dirname(directory)
+        try:
+            state = load_journal(directory)
+        except (OSError, KeyError):
+            state = None
+        if not args.force and outputs_current(state, args.images_per_page, output_dir, not args.no_ocr):
+            print(f"{os.path.basename(directory)}: up to date, skipped")
+            skipped += 1
+            continue
+        tasks.append({
+            "directory": directory,
+            "output_dir": output_dir,
+            "images_per_page": args.images_per_page,
+            "ocr": not args.no_ocr,
+            "backend": args.ocr_backend,
+            # Split the cores between the sessions running at once
+            "ocr_workers": max(1, cores // min(jobs, len(sessions))),
+            "cache": not args.no_cache,
+            "index": not args.no_index,
+            "progress": progress,
+        })
+    if not tasks:
+        print(f"All {skipped} sessions are up to date.")
+        return 0
+
+    jobs = min(jobs, len(tasks))
+    print(f"Compiling {len(tasks)} sessions on {jobs} processes ({skipped} up to date).")
+    labels = {task["directory"]: f"[{i}/{len(tasks)}] {os.path.basename(task['directory'])}"
+              for i, task in enumerate(tasks, 1)}
+    results = []
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    pending = set(pool.submit(compile_session, task) for task in tasks)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.2)
+            _print_progress(progress, labels)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                print(f"{labels[result['directory']]}: {result['status']} "
+                      f"({result['pages']} pages in {result['seconds']:.1f} s)")
+    except KeyboardInterrupt:
+        # Sessions not started yet are left as they are
+        for future in pending:
+            future.cancel()
+        print("Interrupted; waiting for running sessions to finish...")
+    finally:
+        pool.shutdown(wait=True)
+        manager.shutdown()
+    elapsed = time.perf_counter() - start
+
+    compiled = [result for result in results if result["ok"]]
+    pages = sum(result["pages"] for result in results)
+    print(f"{len(compiled)} compiled, {len(results) - len(compiled)} failed, {skipped} skipped "
+          f"in {elapsed:.1f} s: {len(compiled) / (elapsed / 60):.1f} sessions/min, "
+          f"{pages / elapsed:.1f} pages/s")
+    return 0 if len(compiled) == len(tasks) else 1
+
+def _print_progress(progress, labels):
+    while True:
+        try:
+            directory, percent = progress.get_nowait()
+        except queue.Empty:
+            return
+        if percent == "OCR":
+            print(f"{labels[directory]}: performing OCR...")
+        else:
+            print(f"{labels[directory]}: {percent}%")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import argparse
+import os
+import signal
+import sys
+
+# Only argparse is imported up front, so --help and argument errors are
+# instant; Qt, numpy and the PDF/OCR stack load once a session starts.
+
+def parse_region(text):
+    try:
+        region = tuple(int(value) for value in text.split(","))
+    except ValueError:
+        region = ()
+    if len(region) != 4 or region[2] <= 0 or region[3] <= 0:
+        raise argparse.ArgumentTypeError("expected X,Y,WIDTH,HEIGHT in pixels")
+    return region
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py --headless",
+        description="Capture a screen region to a searchable PDF without the GUI. "
+                    "Stops after --minutes, on Ctrl+C or SIGTERM, or when a replay runs out of frames.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--region", type=parse_region, action="append", metavar="X,Y,W,H",
+                        help="screen region to capture; repeat it to record several regions, "
+                             "each into its own PDF, from a single screen grab per tick")
+    source.add_argument("--replay", metavar="DIR",
+                        help="replay a directory of PNG stills instead of grabbing the screen")
+    parser.add_argument("--minutes", type=float, help="stop capturing after this many minutes")
+    parser.add_argument("--output", default="Default",
+                        help="directory for the capture folder and PDF (default: ~/Desktop)")
+    parser.add_argument("--images-per-page", type=int, choices=[1, 2, 4], default=4)
+    parser.add_argument("--ocr-workers", type=int, default=0, help="OCR worker count (0 = auto)")
+    parser.add_argument("--no-ocr", action="store_true", help="write an image-only PDF")
+    parser.add_argument("--session-store", action="store_true",
+                        help="append frames to a single frames.ssn file")
+    parser.add_argument("--encoding", choices=["png", "palette", "jpeg", "auto"], default="png",
+                        help="how captured frames are saved (default: %(default)s)")
+    parser.add_argument("--jpeg-quality", type=int, default=85,
+                        help="JPEG quality for frames and PDF images (default: %(default)s)")
+    parser.add_argument("--byte-budget", type=float, metavar="MB",
+                        help="disk budget for the frames of each region; encoding degrades as it fills")
+    parser.add_argument("--pdf-encoding", choices=["png", "jpeg", "auto"],
+                        help="re-encode images embedded in the PDF (default: embed them as captured)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.replay:
+        if not os.path.isdir(args.replay):
+            print(f"Error: {args.replay} is not a directory.")
+            return 2
+        # Replays never touch the screen
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtGui import QGuiApplication
+    from .core.headless import HeadlessSession
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    session = HeadlessSession(regions=args.region, images_per_page=args.images_per_page,
+                              output_dir=args.output, ocr=not args.no_ocr,
+                              ocr_workers=args.ocr_workers or None, use_session_store=args.session_store,
+                              encoding=args.encoding, jpeg_quality=args.jpeg_quality,
+                              byte_budget=int(args.byte_budget * 1024 * 1024) if args.byte_budget else None,
+                              pdf_encoding=args.pdf_encoding)
+    if args.replay:
+        session.replay(args.replay)
+
+    def stop_on_signal(signum, frame):
+        # A second signal kills the process without waiting for the PDF
+        signal.signal(signum, signal.SIG_DFL)
+        session.stop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, stop_on_signal)
+    # Python only runs signal handlers between bytecodes; wake it regularly
+    # while the Qt event loop is idle
+    wakeup = QTimer()
+    wakeup.timeout.connect(lambda: None)
+    wakeup.start(200)
+    if args.minutes:
+        QTimer.singleShot(int(args.minutes * 60000), session.stop)
+
+    session.finished.connect(app.quit)
+    QTimer.singleShot(0, session.start)
+    app.exec()
+    session.wait()
+    return session.exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
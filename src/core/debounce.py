@@ -0,0 +1,101 @@
+from ..utils.change_detector import ChangeDetector
+
+IDLE = "idle"
+SETTLING = "settling"
+
+class TransitionDebouncer:
+    """Waits for animated slide transitions to finish before capturing.
+
+    When a change against the last capture is detected the debouncer enters
+    SETTLING and compares each new frame with the previous tick's frame using
+    a much stricter threshold. Once the picture has held still for
+    settle_ticks ticks or settle_seconds, the settled frame is captured once.
+    Frames that were still moving are counted in suppressed_frames.
+    max_settle_seconds bounds the wait for regions that never fully settle
+    (e.g. a playing video).
+
+    "Still" means a frame-to-frame MSE of at most stability_threshold. By
+    default it is stability_ratio times the change detector's threshold
+    (50 for the default 500), so it stays above ordinary capture noise
+    (about 30 for +-6 levels per pixel) while fades still count as moving.
+    On noisier sources raise stability_ratio or set stability_threshold;
+    if it is below the noise floor every slide waits max_settle_seconds.
+    """
+
+    def __init__(self, settle_ticks=2, settle_seconds=0.6, max_settle_seconds=3.0,
+                 stability_threshold=None, stability_ratio=0.1, detector=None):
+        self.settle_ticks = settle_ticks
+        self.settle_seconds = settle_seconds
+        self.max_settle_seconds = max_settle_seconds
+        self.stability_threshold = stability_threshold
+        self.stability_ratio = stability_ratio
+        self.detector = detector  # The change detector whose threshold sets the default
+        self.stability = ChangeDetector(mse_threshold=self.current_stability_threshold())
+        self.reset()
+
+    def current_stability_threshold(self):
+        if self.stability_threshold is not None:
+            return self.stability_threshold
+        change_threshold = self.detector.mse_threshold if self.detector is not None else 500
+        return self.stability_ratio * change_threshold
+
+    def reset(self):
+        self.state = IDLE
+        self.suppressed_frames = 0
+        self.transitions = 0
+        self._previous = None
+        self._stable_ticks = 0
+        self._stable_since = 0.0
+        self._settle_started = 0.0
+
+    @property
+    def settling(self):
+        return self.state == SETTLING
+
+    def step(self, frame, changed, now):
+        """Feed one tick's Frame. changed is whether it differs from the last capture.
+
+        Returns True when the current frame should be captured. The Frame
+        itself is kept between ticks, not its pixels: those may be a view
+        into a grab buffer that only the Frame keeps alive.
+        """
+        if self.settle_ticks <= 0:
+            return changed
+
+        if self.state == IDLE:
+            if changed:
+                self.state = SETTLING
+                # Follows changes to the thresholds made between transitions
+                self.stability.mse_threshold = self.current_stability_threshold()
+                self.transitions += 1
+                self._previous = frame
+                self._stable_ticks = 0
+                self._stable_since = now
+                self._settle_started = now
+            return False
+
+        if self.stability.is_different(frame.pixels, self._previous.pixels):
+            # Still animating: this frame would have been a half-rendered capture
+            self.suppressed_frames += 1
+            self._stable_ticks = 0
+            self._stable_since = now
+        else:
+            self._stable_ticks += 1
+        self._previous = frame
+
+        settled = self._stable_ticks >= self.settle_ticks or (
+            self._stable_ticks > 0 and now - self._stable_since >= self.settle_seconds)
+        timed_out = now - self._settle_started >= self.max_settle_seconds
+        if not (settled or timed_out):
+            return False
+
+        self.state = IDLE
+        self._previous = None
+        # A transition that ended back on the captured slide produces nothing
+        return changed
+
+    def stats(self):
+        return {
+            "transitions": self.transitions,
+            "suppressed_frames": self.suppressed_frames,
+        }
@@ -0,0 +1,162 @@
+import os
+import glob
+import numpy as np
+from PIL import Image
+from ..utils.image_utils import Frame, grab_frame, grab_frames
+
+class FrameSource:
+    """Base class for anything ScreenMonitor can pull frames from.
+
+    read() returns the next Frame, or None once the source is exhausted.
+    Live sources are paced by the monitor's polling schedule; offline sources
+    are replayed as fast as the pipeline can consume them.
+    frame_interval is the nominal time between frames, used as the replay
+    clock for offline sources.
+    """
+    live = False
+    frame_interval = 0.25
+
+    def open(self):
+        pass
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class ScreenFrameSource(FrameSource):
+    """Grabs the selected region of the primary screen on every read."""
+    live = True
+
+    def __init__(self, region):
+        self.region = region
+
+    def read(self):
+        return grab_frame(self.region)
+
+class MultiRegionFrameSource(FrameSource):
+    """Grabs several regions of the primary screen with one grab per read.
+
+    read() returns a list with one Frame per region, all views into the
+    same grab of the regions' bounding box.
+    """
+    live = True
+
+    def __init__(self, regions):
+        self.regions = list(regions)
+
+    def read(self):
+        return grab_frames(self.regions)
+
+class DirectoryFrameSource(FrameSource):
+    """Replays a directory of still images in filename order."""
+
+    def __init__(self, directory, pattern="*.png"):
+        self.directory = directory
+        self.pattern = pattern
+        self._paths = []
+        self._index = 0
+
+    def open(self):
+        self._paths = sorted(glob.glob(os.path.join(self.directory, self.pattern)))
+        self._index = 0
+
+    def read(self):
+        if self._index >= len(self._paths):
+            return None
+        path = self._paths[self._index]
+        self._index += 1
+        with Image.open(path) as img:
+            return Frame.from_image(img)
+
+class VideoFrameSource(FrameSource):
+    """Decodes a recorded video file, sampling one frame per polling interval.
+
+    Requires OpenCV (pip install opencv-python). sample_interval is in
+    seconds of video time and defaults to the live monitor's 0.25 s tick, so
+    a replay sees the same frames a live session would have.
+    """
+
+    def __init__(self, path, sample_interval=0.25):
+        self.path = path
+        self.sample_interval = sample_interval
+        self.frame_interval = sample_interval
+        self._capture = None
+        self._step = 1
+
+    def open(self):
+        try:
+            import cv2
+        except ImportError:
+            raise RuntimeError("Video replay requires OpenCV. Please install opencv-python.")
+        self._cv2 = cv2
+        self._capture = cv2.VideoCapture(self.path)
+        if not self._capture.isOpened():
+            raise RuntimeError(f"Could not open video file: {self.path}")
+        fps = self._capture.get(cv2.CAP_PROP_FPS) or 0
+        self._step = max(1, int(round(fps * self.sample_interval))) if fps > 0 else 1
+
+    def read(self):
+        if self._capture is None:
+            return None
+        # grab() skips decoding for frames between samples
+        for _ in range(self._step - 1):
+            if not self._capture.grab():
+                return None
+        ok, frame = self._capture.read()
+        if not ok:
+            return None
+        # OpenCV decodes to BGR; keep it and let the Frame track the order
+        return Frame(frame, "BGR")
+
+    def close(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+class SyntheticFrameSource(FrameSource):
+    """Generates a deterministic fake slide deck for benchmarks and dry runs.
+
+    Each slide is held for frames_per_slide reads. A non-zero noise value adds
+    per-frame jitter (in 0-255 intensity units) to mimic capture noise.
+    """
+
+    def __init__(self, width=1280, height=720, slides=10, frames_per_slide=8, noise=0, seed=0):
+        self.width = width
+        self.height = height
+        self.slides = slides
+        self.frames_per_slide = frames_per_slide
+        self.noise = noise
+        self.seed = seed
+        self._index = 0
+        self._rng = None
+
+    def open(self):
+        self._index = 0
+        self._rng = np.random.default_rng(self.seed)
+
+    def render_slide(self, slide_index):
+        """Render slide number slide_index as an RGB uint8 array."""
+        rng = np.random.default_rng((self.seed, slide_index))
+        arr = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        arr[:] = rng.integers(0, 256, size=3, dtype=np.uint8)
+        # A title bar and a few "text" lines in a contrasting colour
+        ink = 255 - arr[0, 0]
+        bar_height = max(1, self.height // 12)
+        arr[bar_height:bar_height * 2, self.width // 10:self.width * 9 // 10] = ink
+        for line in range(4, 10):
+            top = line * bar_height
+            length = int(self.width * rng.uniform(0.3, 0.8))
+            arr[top:top + max(1, bar_height // 3), self.width // 10:self.width // 10 + length] = ink
+        return arr
+
+    def read(self):
+        if self._index >= self.slides * self.frames_per_slide:
+            return None
+        arr = self.render_slide(self._index // self.frames_per_slide)
+        self._index += 1
+        if self.noise:
+            jitter = self._rng.integers(-self.noise, self.noise + 1, size=arr.shape, dtype=np.int16)
+            arr = np.clip(arr.astype(np.int16) + jitter, 0, 255).astype(np.uint8)
+        return Frame(arr)
@@ -0,0 +1,188 @@
+import queue
+import threading
+import time
+from ..utils.encoding import EncodingPolicy, PNG_COMPRESS_LEVEL
+
+# Backpressure policies when the queue is full
+BLOCK = "block"              # capture loop waits for a free slot
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued frame
+DEGRADE = "degrade"          # encode faster (lower PNG effort) once the queue is filling up
+
+DEGRADED_COMPRESS_LEVEL = 1
+
+class FrameWriter:
+    """Bounded queue plus a pool of threads that encode and write captures.
+
+    submit() hands a frame to the pool and returns immediately (subject to
+    the backpressure policy). on_written(path, filename) is called for every
+    frame that reaches disk, always in submission order, so callers can keep
+    an ordered list of captures even though encoding runs in parallel; path
+    is where the frame ended up and filename what was passed to submit().
+    Frames that are dropped or fail to write are reported through
+    on_dropped(filename).
+
+    Each frame is encoded according to encoding (an EncodingPolicy), which
+    also decides the file extension. With a store (a SessionStore) set,
+    frames are appended to it instead of being written as separate files.
+    """
+
+    def __init__(self, on_written=None, on_dropped=None, workers=2, max_queue=8, policy=BLOCK,
+                 metrics=None, encoding=None):
+        self.on_written = on_written
+        self.on_dropped = on_dropped
+        self.metrics = metrics  # Optional Metrics receiving convert/encode/write timings
+        self.workers = workers
+        self.max_queue = max_queue
+        self.policy = policy
+        self.encoding = encoding or EncodingPolicy()
+        self.store = None
+        self._queue = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._next_delivery = 0
+        self._completed = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_degraded = 0
+        self.bytes_written = 0
+        self.max_queue_depth = 0
+        self.total_encode_seconds = 0.0
+        self.max_encode_seconds = 0.0
+
+    def start(self):
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._next_seq = 0
+        self._next_delivery = 0
+        self._completed = {}
+        self.reset_stats()
+        self.encoding.reset()
+        self._threads = [threading.Thread(target=self._worker, daemon=True)
+                         for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, frame, filename):
+        """Queue a Frame to be written to filename plus the encoding's extension.
+
+        Callbacks receive the final path; dropped frames report filename as given.
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+
+        compress_level = PNG_COMPRESS_LEVEL
+        if self.policy == DEGRADE and self._queue.qsize() >= self.max_queue // 2:
+            compress_level = DEGRADED_COMPRESS_LEVEL
+        item = (seq, frame, filename, compress_level)
+
+        if self.policy == DROP_OLDEST:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        dropped = self._queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                    self._queue.task_done()
+                    with self._lock:
+                        self.frames_dropped += 1
+                    self._complete(dropped[0], dropped[2], None)
+        else:
+            self._queue.put(item)
+
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    def close(self):
+        """Flush everything still queued and stop the workers."""
+        if self._queue is None:
+            return
+        self._queue.join()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._queue = None
+
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self):
+        """Snapshot of the writer's counters for sizing the pool."""
+        with self._lock:
+            written = self.frames_written
+            stats = {
+                "queue_depth": self.queue_depth(),
+                "max_queue_depth": self.max_queue_depth,
+                "frames_written": written,
+                "frames_dropped": self.frames_dropped,
+                "frames_degraded": self.frames_degraded,
+                "bytes_written": self.bytes_written,
+                "avg_encode_seconds": self.total_encode_seconds / written if written else 0.0,
+                "max_encode_seconds": self.max_encode_seconds,
+            }
+            stats.update(self.encoding.stats())
+            return stats
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            seq, frame, filename, compress_level = item
+            try:
+                start = time.perf_counter()
+                # The RGB image is only materialised here, off the capture thread
+                image = frame.to_image()
+                converted = time.perf_counter()
+                buffer, extension, _ = self.encoding.encode(image, compress_level)
+                encoded = time.perf_counter()
+                if self.store is not None:
+                    path = self.store.ref(self.store.append(buffer.getbuffer(), extension))
+                else:
+                    path = filename + extension
+                    with open(path, "wb") as f:
+                        f.write(buffer.getbuffer())
+                done = time.perf_counter()
+                elapsed = done - start
+                size = buffer.tell()
+                if self.metrics:
+                    self.metrics.add_time("convert", converted - start)
+                    self.metrics.add_time("encode", encoded - converted)
+                    self.metrics.add_time("write", done - encoded)
+                    self.metrics.count("bytes_written", size)
+                with self._lock:
+                    self.frames_written += 1
+                    self.bytes_written += size
+                    self.total_encode_seconds += elapsed
+                    self.max_encode_seconds = max(self.max_encode_seconds, elapsed)
+                    if compress_level != PNG_COMPRESS_LEVEL:
+                        self.frames_degraded += 1
+                self._complete(seq, filename, path)
+            except Exception as e:
+                print(f"Error writing frame {filename}: {e}")
+                self._complete(seq, filename, None)
+            finally:
+                self._queue.task_done()
+
+    def _complete(self, seq, filename, path):
+        """Record a finished (path set) or dropped frame and deliver callbacks in order."""
+        with self._lock:
+            self._completed[seq] = (filename, path)
+            # Delivering under the lock keeps callbacks ordered across workers
+            while self._next_delivery in self._completed:
+                name, written = self._completed.pop(self._next_delivery)
+                self._next_delivery += 1
+                if written is None:
+                    if self.on_dropped:
+                        self.on_dropped(name)
+                elif self.on_written:
+                    self.on_written(written, name)
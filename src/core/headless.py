@@ -0,0 +1,208 @@
+import os
+import sqlite3
+from datetime import datetime
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
+from .monitor import ScreenMonitor, MultiRegionMonitor
+from .frame_sources import DirectoryFrameSource
+from .pdf_compiler import PDFCompiler
+from .ocr_processor import OCRProcessor
+from .ocr_pool import OCRPool
+from .ocr_backends import default_backend
+from ..utils.ocr_cache import OCRCache
+from ..utils.search_index import SearchIndex
+from ..utils.encoding import EncodingPolicy, PNG
+
+class HeadlessSession(QObject):
+    """One capture session driven from the command line instead of MainWindow.
+
+    Runs the same pipeline as the GUI: pages are laid out while frames
+    are captured, frames are OCR'd on a pool when tesseract is available
+    (ocrmypdf runs afterwards otherwise), and the session is journaled.
+    With several regions, one MultiRegionMonitor grabs them all and each
+    region gets its own capture directory and PDF; the OCR pool is shared.
+    finished is emitted once every PDF and OCR is done and the compiler
+    threads have stopped; exit_code is then 0 on success and 1 on error.
+    """
+
+    finish_pdf_stream = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(self, regions=None, images_per_page=4, output_dir="Default", ocr=True, ocr_workers=None,
+                 use_session_store=False, encoding=PNG, jpeg_quality=85, byte_budget=None, pdf_encoding=None):
+        super().__init__()
+        regions = list(regions or [])
+        if len(regions) > 1:
+            self.monitor = MultiRegionMonitor(regions)
+            self.monitors = self.monitor.monitors
+        else:
+            self.monitor = ScreenMonitor()
+            if regions:
+                self.monitor.set_region(regions[0])
+            self.monitors = [self.monitor]
+        for monitor in self.monitors:
+            monitor.use_session_store = use_session_store
+            # Each region's frames get their own byte budget
+            monitor.writer.encoding = EncodingPolicy(encoding, jpeg_quality=jpeg_quality, byte_budget=byte_budget)
+        self.jpeg_quality = jpeg_quality
+        self.pdf_encoding = pdf_encoding
+        self.images_per_page = images_per_page
+        self.output_dir = output_dir
+        self.ocr = ocr
+        self.ocr_workers = ocr_workers
+        self.exit_code = 0
+        self.ocr_pool = None
+        self.ocr_cache = None
+        self.search_index = None
+        self._streams = {}  # PDFCompiler -> (ScreenMonitor, QThread)
+        self._open_streams = 0
+        self._running_threads = 0
+        self._stopping = False
+
+    def replay(self, directory):
+        """Capture from a directory of stills; the session stops when they run out."""
+        self.monitor.set_source(DirectoryFrameSource(directory))
+        # Stills are already settled, so there are no transitions to wait out
+        self.monitor.debouncer.settle_ticks = 0
+
+    def start(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        multi = isinstance(self.monitor, MultiRegionMonitor)
+        names = self.monitor.session_names(timestamp) if multi else [None]
+        if self.ocr and self._start_ocr_pool() is not None:
+            self.search_index = self._open(SearchIndex, "Search index")
+
+        for monitor, name in zip(self.monitors, names):
+            thread = QThread()
+            compiler = PDFCompiler()
+            compiler.set_metrics(monitor.metrics)
+            compiler.image_encoding = self.pdf_encoding
+            compiler.jpeg_quality = self.jpeg_quality
+            compiler.set_ocr(self.ocr_pool)
+            compiler.set_search_index(self.search_index)
+            compiler.begin_stream(self.images_per_page, self._pdf_directory(), name)
+            compiler.moveToThread(thread)
+            if self.ocr_pool is not None:
+                monitor.screenshot_taken.connect(self.ocr_pool.submit, Qt.ConnectionType.DirectConnection)
+            monitor.screenshot_taken.connect(compiler.add_image)
+            self.finish_pdf_stream.connect(compiler.finish_stream)
+            compiler.finished.connect(self.pdf_generation_finished)
+            # The session is over once every compiler thread has wound down
+            thread.finished.connect(self._thread_finished)
+            thread.start()
+            self._streams[compiler] = (monitor, thread)
+        self._open_streams = self._running_threads = len(self._streams)
+
+        if multi:
+            self.monitor.start(images_per_page=self.images_per_page, pdf_directory=self.output_dir,
+                               timestamp=timestamp)
+        else:
+            self.monitor.start(images_per_page=self.images_per_page, pdf_directory=self.output_dir)
+        for compiler, (monitor, _) in self._streams.items():
+            compiler.set_journal(monitor.journal)
+            print(f"Capturing to {monitor.output_dir}")
+        print("Press Ctrl+C to stop.")
+        # A replay ends on its own once its frames run out
+        self.monitor.finished.connect(self.stop)
+
+    def _pdf_directory(self):
+        if self.output_dir == "Default":
+            return os.path.expanduser("~/Desktop")
+        return self.output_dir
+
+    def _open(self, factory, label):
+        try:
+            return factory()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: {label} unavailable: {e}")
+            return None
+
+    def _start_ocr_pool(self):
+        backend = default_backend()
+        if backend is None:
+            return None
+        self.ocr_cache = self._open(OCRCache, "OCR cache")
+        metrics = self.monitors[0].metrics
+        self.ocr_pool = OCRPool(workers=self.ocr_workers, backend=backend, metrics=metrics, cache=self.ocr_cache)
+        self.ocr_pool.start()
+        return self.ocr_pool
+
+    def stop(self):
+        """Stop capturing and finish the PDFs (safe to call more than once)."""
+        if self._stopping or not self._streams:
+            return
+        self._stopping = True
+        self.monitor.stop()
+        for compiler, (monitor, _) in self._streams.items():
+            captured = monitor.captured_count
+            if captured:
+                # add_image calls still queued on the compiler thread run before
+                # finish_stream; the stream is disconnected once it reports back
+                print(f"{self._label(monitor)}: captured {captured} slides; finalizing PDF...")
+            else:
+                self._disconnect(compiler)
+                self.close_stream(compiler, "Monitoring stopped. No images captured.")
+        self.finish_pdf_stream.emit()
+
+    def _label(self, monitor):
+        return os.path.basename(monitor.output_dir)
+
+    def _disconnect(self, compiler):
+        monitor, _ = self._streams[compiler]
+        monitor.screenshot_taken.disconnect()
+        self.finish_pdf_stream.disconnect(compiler.finish_stream)
+
+    def pdf_generation_finished(self, result_message):
+        compiler = self.sender()
+        self._disconnect(compiler)
+        # A searchable PDF already has its text layer; an image-only one gets ocrmypdf
+        if self.ocr and result_message.startswith("PDF generated: "):
+            self.run_ocr(compiler, result_message.split("PDF generated: ", 1)[1])
+        else:
+            self.close_stream(compiler, result_message)
+
+    def run_ocr(self, compiler, pdf_path):
+        """OCR a finished PDF with ocrmypdf; there is no window to keep responsive."""
+        monitor, _ = self._streams[compiler]
+        print(f"{self._label(monitor)}: performing OCR...")
+        worker = OCRProcessor()
+        worker.set_metrics(monitor.metrics)
+        worker.set_journal(monitor.journal)
+        worker.jobs = self.ocr_workers
+        directory, name = os.path.split(pdf_path)
+        worker.set_params(pdf_path, os.path.join(directory, f"OCR_{name}"))
+        worker.finished.connect(lambda status: self.close_stream(compiler, status))
+        worker.run_ocr()
+
+    def close_stream(self, compiler, status):
+        """Record a region's final status and stop its compiler thread."""
+        monitor, thread = self._streams[compiler]
+        if status.lower().startswith(("error", "unexpected error")):
+            self.exit_code = 1
+        print(f"{self._label(monitor)}: {status}")
+        if monitor.journal is not None:
+            monitor.journal.record("closed", status=status)
+            monitor.journal.close()
+        monitor.metrics.dump(os.path.join(monitor.output_dir, "metrics.json"))
+        print(f"{self._label(monitor)}: {monitor.metrics.summary_text()}")
+        thread.quit()
+        self._open_streams -= 1
+        if self._open_streams == 0:
+            self._release()
+
+    def _release(self):
+        if self.ocr_pool is not None:
+            self.ocr_pool.close()
+            self.ocr_pool = None
+        for resource in (self.ocr_cache, self.search_index):
+            if resource is not None:
+                resource.close()
+
+    def _thread_finished(self):
+        self._running_threads -= 1
+        if self._running_threads == 0:
+            self.finished.emit()
+
+    def wait(self):
+        """Block until every compiler thread has exited (after finished)."""
+        for _, thread in self._streams.values():
+            thread.wait()
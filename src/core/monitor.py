@@ -5,38 +5,314 @@ from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QThread, pyqtSignal
 import numpy as np
 from PIL import Image
-from ..utils.image_utils import get_screenshot, compare_images
+from ..utils.change_detector import ChangeDetector, mask_from_zones
+from ..utils.perceptual_hash import phash
+from ..utils.hash_index import BKTree
+from ..utils.metrics import Metrics
+from ..utils.session_store import SessionStore, open_frame, STORE_EXTENSION
+from ..utils.journal import SessionJournal, load_journal
+from .frame_sources import ScreenFrameSource, MultiRegionFrameSource
+from .frame_writer import FrameWriter
+from .scheduler import PollScheduler
+from .debounce import TransitionDebouncer
 
 class ScreenMonitor(QThread):
     screenshot_taken = pyqtSignal(str)
+    slide_revisited = pyqtSignal(str)  # Path of the earlier capture that matched
     
     def __init__(self):
         super().__init__()
         self.running = False
         self.region = None
-        self.captured_images = []
-        self.last_image = None
+        self.ignore_zones = []
+        self._mask_shape = None
+        self.source = None
+        # Only counts are kept in memory; the captured paths are in the journal
+        self.captured_count = 0
+        self.last_frame = None  # Last capture; holds the buffer its pixels view
+        self.detector = ChangeDetector()
         self.output_dir = None
+        # Revisit detection: frames within revisit_distance bits of an earlier
+        # capture are verified against it and recorded as references
+        self.skip_revisits = True
+        self.revisit_distance = 6
+        self.hash_index = BKTree()
+        self.revisit_count = 0
+        # Per-stage timings and counters, shared with the PDF and OCR workers
+        self.metrics = Metrics()
+        # PNG encoding and disk writes happen off the capture loop
+        self.writer = FrameWriter(on_written=self._frame_written, on_dropped=self._frame_dropped,
+                                  metrics=self.metrics)
+        # file stem -> (Frame, hash index entry) for frames still queued for writing.
+        # Index entries are [stem], replaced by the written path (whose
+        # extension depends on the encoding) once the frame reaches disk
+        self._pending = {}
+        self._latest_frame = None  # Most recent grab, captured if stopped mid-transition
+        self.thumbnailer = None  # Optional Thumbnailer previewing each capture from memory
+        # Append frames to a single session file instead of one file per frame
+        self.use_session_store = False
+        self.store = None
+        # Crash-safe record of the session, kept in its capture directory
+        self.journal = None
+        # Polling cadence for live sources: backs off while static, bursts after changes
+        self.scheduler = PollScheduler()
+        # Capture animated transitions once, after the picture settles
+        self.debouncer = TransitionDebouncer(detector=self.detector)
         
     def set_region(self, region):
         self.region = region
+        self.source = ScreenFrameSource(region)
     
+    def set_ignore_zones(self, zones):
+        """Set (x, y, w, h) rectangles, relative to the region, excluded from change detection."""
+        self.ignore_zones = list(zones or [])
+        self._mask_shape = None
+    
+    def _update_ignore_mask(self, pixels):
+        """(Re)build the detectors' ignore mask when the frame size changes."""
+        shape = pixels.shape[:2]
+        if shape == self._mask_shape:
+            return
+        self._mask_shape = shape
+        mask = None
+        if self.ignore_zones:
+            region_size = self.region[2:4] if self.region else None
+            mask = mask_from_zones(self.ignore_zones, (shape[1], shape[0]), region_size)
+        self.detector.set_ignore_mask(mask)
+        self.debouncer.stability.set_ignore_mask(mask)
+    
+    def set_source(self, source):
+        """Use a FrameSource (e.g. a directory or video replay) instead of the screen."""
+        self.source = source
+    
+    @property
+    def last_array(self):
+        return self.last_frame.pixels if self.last_frame is not None else None
+
     def has_region(self):
         return self.region is not None
     
+    def has_source(self):
+        return self.source is not None
+    
     def get_captured_images(self):
-        return self.captured_images
+        """Paths captured so far in this session, read back from its journal."""
+        state = load_journal(self.output_dir) if self.output_dir else None
+        return state.frames if state is not None else []
+    
+    def get_writer_stats(self):
+        """Queue depth, encode latency and drop counters of the frame writer."""
+        return self.writer.stats()
+    
+    def get_session_stats(self):
+        """Counters describing the current (or last) session."""
+        stats = {
+            "captured": self.captured_count,
+            "revisits": self.revisit_count,
+        }
+        stats.update(self.debouncer.stats())
+        stats.update(self.scheduler.stats())
+        stats.update(self.writer.stats())
+        return stats
     
     def start(self, pdf_enabled=True, images_per_page=1, pdf_directory="Default"):
+        self.begin_session(pdf_enabled, images_per_page, pdf_directory)
+        self.running = True
+        super().start()
+    
+    def begin_session(self, pdf_enabled=True, images_per_page=1, pdf_directory="Default", name=None):
+        """Create the session's output directory, store and journal.
+
+        name is the directory name, capture_<timestamp> by default.
+        """
         if pdf_directory == "Default":
             pdf_directory = os.path.expanduser("~/Desktop")
         
         # Create output directory
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.output_dir = os.path.join(pdf_directory, f"capture_{timestamp}")
+        if name is None:
+            name = f"capture_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.output_dir = os.path.join(pdf_directory, name)
         os.makedirs(self.output_dir, exist_ok=True)
         
-        self.captured_images = []
+        self.captured_count = 0
+        self.last_frame = None
+        self.hash_index = BKTree()
+        self.revisit_count = 0
+        self._pending = {}
+        if self.use_session_store:
+            self.store = SessionStore(os.path.join(self.output_dir, "frames" + STORE_EXTENSION), append=True)
+        else:
+            self.store = None
+        self.writer.store = self.store
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = SessionJournal(self.output_dir)
+        self.journal.record("session", images_per_page=images_per_page, pdf_enabled=pdf_enabled)
+        self.metrics.start_session()
+    
+    def stop(self):
+        self.running = False
+        self.wait()
+    
+    def find_revisit(self, frame_hash, frame):
+        """Return the path of an earlier capture showing the same slide, or None."""
+        if not self.skip_revisits:
+            return None
+        for _, entry in self.hash_index.find(frame_hash, self.revisit_distance):
+            # Hash neighbours are only candidates; confirm with the same
+            # MSE test that decides captures so distinct slides are never merged
+            pending = self._pending.get(entry[0])
+            earlier = pending[0].pixels if pending is not None else None
+            # Read after the lookup: a writer updates the entry before unqueuing it
+            path = entry[0]
+            if earlier is None:
+                try:
+                    with open_frame(path) as img:
+                        earlier = frame.as_rgb(np.asarray(img.convert("RGB")))
+                except (OSError, IndexError):
+                    continue  # Dropped by the writer or unreadable
+            if not self.detector.is_different(frame.pixels, earlier):
+                return path
+        return None
+    
+    def capture_frame(self, frame):
+        """Save frame, or record it as a revisit of an earlier capture."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        frame_hash = phash(frame.pixels)
+        original = self.find_revisit(frame_hash, frame)
+        if original:
+            # Presenter went back to an earlier slide: reference it
+            self.revisit_count += 1
+            self.journal.record("revisit", path=original)
+            self.metrics.count("revisits")
+            self.slide_revisited.emit(original)
+        else:
+            # Save screenshot; the writer appends the extension of the chosen encoding
+            stem = os.path.join(self.output_dir, f"screenshot_{timestamp}")
+            entry = [stem]
+            self._pending[stem] = (frame, entry)
+            self.hash_index.add(frame_hash, entry)
+            self.writer.submit(frame, stem)
+            self.metrics.count("captures")
+            if self.thumbnailer is not None:
+                self.thumbnailer.submit(frame, stem)
+        self.last_frame = frame
+    
+    def run(self):
+        source = self.source
+        source.open()
+        self.open_capture()
+        ticks = 0
+        try:
+            while self.running:
+                tick_start = time.perf_counter()
+                with self.metrics.timed("grab"):
+                    current_frame = source.read()
+                if current_frame is None:
+                    break  # Offline source exhausted
+                ticks += 1
+                # Offline sources advance a virtual clock at their nominal frame rate
+                now = time.monotonic() if source.live else ticks * source.frame_interval
+                changed = self.process_frame(current_frame, now)
+                self.metrics.observe_tick(time.perf_counter() - tick_start)
+                self.scheduler.record(changed)
+                # Only live sources need pacing; replays run as fast as possible
+                if source.live:
+                    self.scheduler.wait(lambda: self.running)
+            self.flush_transition()
+        finally:
+            source.close()
+            self.close_capture()
+    
+    # The capture loop is split into these steps so MultiRegionMonitor can
+    # drive several monitors from one thread and one grab per tick
+    
+    def open_capture(self):
+        self.writer.start()
+        self.scheduler.reset()
+        self.debouncer.reset()
+        self._mask_shape = None
+        self._latest_frame = None
+    
+    def process_frame(self, frame, now):
+        """Run change detection on one grabbed frame, capturing it once it settles; return whether it changed."""
+        self._latest_frame = frame
+        # Detection runs on the frame's native (possibly strided BGRA)
+        # buffer; no RGB copy is made unless the frame is saved
+        current_array = frame.pixels
+        self._update_ignore_mask(current_array)
+        with self.metrics.timed("diff"):
+            changed = self.last_array is None or self.detector.is_different(current_array, self.last_array)
+            capture = self.debouncer.step(frame, changed, now)
+        if capture:
+            with self.metrics.timed("capture"):
+                self.capture_frame(frame)
+        self.metrics.count("ticks")
+        return changed
+    
+    def flush_transition(self):
+        # Stopping mid-transition: keep the latest frame rather than lose the slide
+        latest_frame = self._latest_frame
+        if self.debouncer.settling and self.detector.is_different(latest_frame.pixels, self.last_array):
+            self.capture_frame(latest_frame)
+        if self.debouncer.suppressed_frames:
+            print(f"Suppressed {self.debouncer.suppressed_frames} intermediate transition frames.")
+    
+    def close_capture(self):
+        # Flush queued frames so every capture is journaled once stop() returns
+        self.writer.close()
+        if self.store is not None:
+            self.store.close()
+        self.journal.record("capture_stopped", captured=self.captured_count)
+        self.metrics.count("suppressed_frames", self.debouncer.suppressed_frames)
+        self.metrics.stop_session()
+        self._latest_frame = None
+        self.running = False
+    
+    def _frame_written(self, path, stem):
+        # Called from writer threads, in capture order
+        pending = self._pending.get(stem)
+        if pending is not None:
+            pending[1][0] = path
+        self._pending.pop(stem, None)
+        self.captured_count += 1
+        self.journal.record("frame", path=path)
+        self.screenshot_taken.emit(path)
+    
+    def _frame_dropped(self, filename):
+        self._pending.pop(filename, None)
+
+class MultiRegionMonitor(QThread):
+    """Monitors several screen regions with a single screen grab per tick.
+
+    Each tick grabs the bounding box of all regions once and hands every
+    region a view of its part of that grab, so adding regions adds change
+    detection work but no grabs. Each region is a ScreenMonitor in
+    monitors, with its own detector, output directory, journal and
+    screenshot_taken signal (and so its own PDF); they are driven from this
+    thread rather than running their own.
+    """
+    
+    def __init__(self, regions):
+        super().__init__()
+        self.running = False
+        self.monitors = []
+        for region in regions:
+            monitor = ScreenMonitor()
+            monitor.set_region(region)
+            self.monitors.append(monitor)
+        self.source = MultiRegionFrameSource(regions)
+        # One polling cadence for all regions: a change in any of them speeds it up
+        self.scheduler = PollScheduler()
+    
+    def session_names(self, timestamp):
+        """Output directory names of the regions for a session started at timestamp."""
+        return [f"capture_{timestamp}_region{i + 1}" for i in range(len(self.monitors))]
+    
+    def start(self, pdf_enabled=True, images_per_page=1, pdf_directory="Default", timestamp=None):
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        for monitor, name in zip(self.monitors, self.session_names(timestamp)):
+            monitor.begin_session(pdf_enabled, images_per_page, pdf_directory, name)
         self.running = True
         super().start()
     
@@ -45,16 +321,30 @@ class ScreenMonitor(QThread):
         self.wait()
     
     def run(self):
-        while self.running:
-            current_image = get_screenshot(self.region)
-            
-            if self.last_image is None or compare_images(current_image, self.last_image):
-                # Save screenshot
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                filename = os.path.join(self.output_dir, f"screenshot_{timestamp}.png")
-                current_image.save(filename)
-                self.captured_images.append(filename)
-                self.screenshot_taken.emit(filename)
-                self.last_image = current_image
-            
-            time.sleep(0.25)  # Increased monitoring frequency delay to 0.5 seconds
+        self.source.open()
+        for monitor in self.monitors:
+            monitor.open_capture()
+        self.scheduler.reset()
+        try:
+            while self.running:
+                tick_start = time.perf_counter()
+                frames = self.source.read()
+                grab_seconds = time.perf_counter() - tick_start
+                now = time.monotonic()
+                changed = False
+                for monitor, frame in zip(self.monitors, frames):
+                    # Every region's metrics report the shared grab
+                    monitor.metrics.add_time("grab", grab_seconds)
+                    changed = monitor.process_frame(frame, now) or changed
+                tick_seconds = time.perf_counter() - tick_start
+                for monitor in self.monitors:
+                    monitor.metrics.observe_tick(tick_seconds)
+                self.scheduler.record(changed)
+                self.scheduler.wait(lambda: self.running)
+            for monitor in self.monitors:
+                monitor.flush_transition()
+        finally:
+            self.source.close()
+            for monitor in self.monitors:
+                monitor.close_capture()
+            self.running = False
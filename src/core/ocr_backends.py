@@ -0,0 +1,178 @@
+import os
+import shutil
+import subprocess
+from ..utils.session_store import open_frame, read_frame_bytes
+
+class OCRWord:
+    """One recognised word; the box is in pixels of the OCR'd frame, origin top-left."""
+
+    def __init__(self, text, left, top, width, height, confidence):
+        self.text = text
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.confidence = confidence
+
+class OCRResult:
+    """Words found in one frame, plus the frame size the boxes refer to."""
+
+    def __init__(self, width, height, words=None, error=None):
+        self.width = width
+        self.height = height
+        self.words = words or []
+        self.error = error
+
+    @property
+    def text(self):
+        return " ".join(word.text for word in self.words)
+
+    def lines(self):
+        """The words grouped into lines, in reading order.
+
+        A word starts a new line when its vertical centre is outside the
+        previous word's box, or when it lies left of the previous word.
+        """
+        lines = []
+        previous = None
+        for word in self.words:
+            centre = word.top + word.height / 2
+            if (previous is None or word.left < previous.left
+                    or not previous.top <= centre <= previous.top + previous.height):
+                lines.append([])
+            lines[-1].append(word)
+            previous = word
+        return lines
+
+    def to_dict(self):
+        return {
+            "width": self.width,
+            "height": self.height,
+            "words": [[w.text, w.left, w.top, w.width, w.height, w.confidence] for w in self.words],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["width"], data["height"], [OCRWord(*word) for word in data["words"]])
+
+class OCRBackend:
+    """Turns one frame into an OCRResult.
+
+    Subclasses set name and implement recognize(); available() reports
+    whether the engine can run here. name and version() are part of the
+    OCR cache key, so upgrading the engine does not serve stale results.
+    recognize() is called from several OCRPool threads at once.
+    """
+
+    name = "base"
+
+    def available(self):
+        return True
+
+    def version(self):
+        """Engine version string, or "" if unknown."""
+        return ""
+
+    def recognize(self, path, language=None):
+        raise NotImplementedError
+
+def parse_tesseract_tsv(tsv):
+    """Build an OCRResult from `tesseract ... tsv` output."""
+    width = height = 0
+    words = []
+    for line in tsv.splitlines()[1:]:
+        fields = line.split("\t")
+        if len(fields) < 12:
+            continue
+        level = fields[0]
+        left, top, box_width, box_height = (int(v) for v in fields[6:10])
+        if level == "1":
+            width, height = box_width, box_height  # Page row: the whole image
+        elif level == "5" and fields[11].strip():
+            words.append(OCRWord(fields[11].strip(), left, top, box_width, box_height, float(fields[10])))
+    return OCRResult(width, height, words)
+
+class TesseractBackend(OCRBackend):
+    """Runs the tesseract CLI on each frame (file path or session store reference)."""
+
+    name = "tesseract"
+
+    def __init__(self, timeout=120):
+        self.timeout = timeout
+        self._version = None
+
+    def available(self):
+        return shutil.which("tesseract") is not None
+
+    def version(self):
+        if self._version is None:
+            try:
+                process = subprocess.run(["tesseract", "--version"], capture_output=True, timeout=10)
+                # First line is e.g. "tesseract 5.3.0"; older releases print it on stderr
+                output = (process.stdout or process.stderr).decode("utf-8", "replace").strip()
+                self._version = output.splitlines()[0] if output else ""
+            except (OSError, subprocess.TimeoutExpired):
+                self._version = ""
+        return self._version
+
+    def recognize(self, path, language=None):
+        command = ["tesseract", "stdin", "stdout"]
+        if language:
+            command += ["-l", language]
+        command.append("tsv")
+        # Frames are OCR'd in parallel, so keep each tesseract single-threaded
+        env = dict(os.environ, OMP_THREAD_LIMIT="1")
+        try:
+            process = subprocess.run(command, input=read_frame_bytes(path), capture_output=True,
+                                     env=env, timeout=self.timeout, check=True)
+            return parse_tesseract_tsv(process.stdout.decode("utf-8", "replace"))
+        except subprocess.CalledProcessError as e:
+            return OCRResult(0, 0, error=e.stderr.decode("utf-8", "replace").strip())
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return OCRResult(0, 0, error=str(e))
+
+class StubBackend(OCRBackend):
+    """Deterministic backend for tests and benchmarks; needs no OCR engine.
+
+    Every frame gets the words of text laid out on one line across the
+    top of the frame, after {name} in text is replaced by the frame's file
+    name.
+    """
+
+    name = "stub"
+
+    def __init__(self, text="Slide {name}"):
+        self.text = text
+
+    def recognize(self, path, language=None):
+        try:
+            with open_frame(path) as img:
+                width, height = img.size
+        except (OSError, IndexError) as e:
+            return OCRResult(0, 0, error=str(e))
+        words = self.text.format(name=os.path.basename(path)).split()
+        if not words:
+            return OCRResult(width, height)
+        box_width = width // len(words)
+        box_height = max(1, height // 10)
+        return OCRResult(width, height, [
+            OCRWord(word, i * box_width, 0, box_width, box_height, 100.0)
+            for i, word in enumerate(words)
+        ])
+
+BACKENDS = {
+    TesseractBackend.name: TesseractBackend,
+    StubBackend.name: StubBackend,
+}
+
+def get_backend(name):
+    """Instantiate a registered backend by name."""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown OCR backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+
+def default_backend():
+    """The best backend that can run here, or None."""
+    backend = TesseractBackend()
+    return backend if backend.available() else None
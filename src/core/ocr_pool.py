@@ -0,0 +1,114 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..utils.ocr_cache import frame_digests
+from .ocr_backends import OCRResult, TesseractBackend
+
+def default_ocr_workers():
+    # Leave cores for capture, encoding and PDF layout
+    return max(1, (os.cpu_count() or 2) // 2)
+
+class OCRPool:
+    """OCRs captured frames on a pool of worker threads while recording continues.
+
+    submit() is called for every frame as it reaches disk (from any
+    thread); result() waits for a frame's words, so PDF layout can draw
+    the text layer of each page as soon as its frames are done. Frames
+    are recognised by backend (an OCRBackend, tesseract by default).
+
+    With a cache (an OCRCache), frames whose content was OCR'd before, in
+    this or an earlier session, are answered from it instead of the engine.
+    """
+
+    def __init__(self, workers=None, language=None, backend=None, metrics=None, cache=None):
+        self.workers = workers or default_ocr_workers()
+        self.language = language
+        self.backend = backend or TesseractBackend()
+        self.metrics = metrics  # Optional Metrics receiving per-frame "ocr" timings
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._executor = None
+        self._namespace = None
+
+    def start(self):
+        if self.cache is not None:
+            # Asks the engine for its version once, not from every worker
+            self._namespace = self._cache_namespace()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+        with self._lock:
+            self._futures = {}
+
+    def submit(self, path):
+        """Queue a frame for OCR (no-op if it is already queued)."""
+        with self._lock:
+            if self._executor is None or path in self._futures:
+                return
+            self._futures[path] = self._executor.submit(self._run, path)
+
+    def _run(self, path):
+        digests = None
+        if self.cache is not None:
+            try:
+                digests = frame_digests(path)
+            except (OSError, IndexError):
+                pass  # Unreadable here; let the engine report it
+            if digests:
+                cached = self.cache.get(self._namespace, *digests)
+                if cached is not None:
+                    self._count("ocr_cache_hits")
+                    return OCRResult.from_dict(cached)
+
+        if self.metrics is None:
+            result = self.backend.recognize(path, self.language)
+        else:
+            with self.metrics.timed("ocr"):
+                result = self.backend.recognize(path, self.language)
+        self._count("ocr_frames")
+        if digests and not result.error:
+            self.cache.put(self._namespace, digests[0], digests[1], result.to_dict())
+        return result
+
+    def _cache_namespace(self):
+        # Results from another backend, engine version or language must not be reused
+        version = self.backend.version()
+        engine = f"{self.backend.name}@{version}" if version else self.backend.name
+        return f"{engine}:{self.language or 'default'}"
+
+    def _count(self, name):
+        if self.metrics is not None:
+            self.metrics.count(name)
+
+    def result(self, path):
+        """Wait for and return the OCRResult of path, submitting it first if needed.
+
+        The result is handed over once; the pool does not keep it.
+        """
+        self.submit(path)
+        with self._lock:
+            future = self._futures.get(path)
+        if future is None:
+            return None
+        result = future.result()
+        with self._lock:
+            self._futures.pop(path, None)
+        return result
+
+    def pending(self):
+        with self._lock:
+            return sum(1 for future in self._futures.values() if not future.done())
+
+    def close(self):
+        """Stop accepting frames; queued OCR still finishes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def cancel(self):
+        """Drop queued frames without waiting; running tesseract calls finish on their own."""
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
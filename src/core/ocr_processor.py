@@ -2,6 +2,7 @@ import os
 import subprocess
 import shutil
 from PyQt6.QtCore import QObject, pyqtSignal
+from ..utils.metrics import Metrics
 
 class OCRProcessor(QObject):
     finished = pyqtSignal(str)  # Signal for completion (output path or error)
@@ -10,6 +11,17 @@ class OCRProcessor(QObject):
         super().__init__()
         self._input_pdf_path = ""
         self._output_pdf_path = ""
+        self.metrics = Metrics()
+        self.journal = None
+        self.jobs = None  # Passed to ocrmypdf --jobs; None lets it use every core
+
+    def set_metrics(self, metrics):
+        """Share a session's Metrics so OCR timings land in the same report."""
+        self.metrics = metrics
+
+    def set_journal(self, journal):
+        """Record completed OCR in a SessionJournal so a restart does not redo it."""
+        self.journal = journal
 
     def set_params(self, input_pdf_path, output_pdf_path):
         """Set parameters before running OCR in a thread."""
@@ -41,9 +53,15 @@ class OCRProcessor(QObject):
                 self._output_pdf_path
                 # Add more arguments here if necessary, e.g., "--language", "eng"
             ]
+            if self.jobs:
+                command += ["--jobs", str(self.jobs)]
 
             # Run the command
-            process = subprocess.run(command, capture_output=True, text=True, check=True)
+            with self.metrics.timed("ocr"):
+                process = subprocess.run(command, capture_output=True, text=True, check=True)
+
+            if self.journal is not None:
+                self.journal.record("ocr_done", path=self._output_pdf_path)
 
             # If successful, delete the original non-OCR PDF
             try:
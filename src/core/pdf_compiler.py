@@ -3,8 +3,14 @@ import time # Added for potential delay simulation if needed
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from PIL import Image
+from reportlab.pdfbase import pdfdoc, pdfmetrics
 from PyQt6.QtCore import QObject, pyqtSignal
+from ..utils.metrics import Metrics
+from ..utils.frame_prep import prepare_frame, iter_prepared
+from ..utils.pdf_concat import concatenate_pdfs
+from ..utils.journal import load_journal
+from ..utils.session_store import parse_ref
+from .ocr_pool import OCRPool
 
 class PDFCompiler(QObject):
     progress_updated = pyqtSignal(int)  # Signal for progress percentage
@@ -17,141 +23,478 @@ class PDFCompiler(QObject):
         self._image_paths = []
         self._images_per_page = 1
         self._output_dir = ""
+        self._pdf_name = None
+        self._canvas = None
+        self._pdf_path = ""
+        self._slot = 0
+        self._page_layout = None
+        self.metrics = Metrics()
+        # Image preparation (decode + compress) runs on a process pool;
+        # None picks a worker count from the CPU count
+        self.workers = None
+        self.max_image_dimension = None  # Downscale larger captures when set
+        # Embedded image encoding (see utils.encoding); None keeps each capture's own
+        self.image_encoding = None
+        self.jpeg_quality = 85
+        # Identical (or near-identical) captures are embedded once and
+        # referenced from every page that shows them
+        self.deduplicate = True
+        self._embedded = {}  # content digest -> XObject name
+        self._images_reused = 0
+        self._bytes_saved = 0
+        # Pages are written in segment files of at most segment_pages pages
+        # and segment_bytes of embedded images, each saved as soon as it is
+        # full, then joined; this bounds memory on long sessions. 0 disables
+        # a limit; both 0 keep the whole document in a single canvas.
+        self.segment_pages = 200
+        self.segment_bytes = 64 * 1024 * 1024
+        self._segment_bytes = 0
+        self._segments = []
+        self._segment_page_count = 0
+        self._segment_full = False
+        self._images_added = 0
+        # Optional SessionJournal receiving segment and completion checkpoints
+        self.journal = None
+        self._frames_done = 0  # Frames consumed, including skipped ones
+        self._resume_from = None  # (pdf path, saved segments, frames they cover)
+        # Optional OCRPool; when set, each page gets an invisible text layer and
+        # the PDF is searchable without a separate OCR pass
+        self.ocr = None
+        self.text_font = "Helvetica"
+        # Batch runs without a pool OCR through ocr_backend (an OCRBackend)
+        # on a pool of their own, when one is set
+        self.ocr_backend = None
+        self.ocr_workers = None
+        # Optional SearchIndex; OCR'd slides are added to it as each segment is saved
+        self.search_index = None
+        self._slides = []
+        self._slides_indexed = False  # Whether this PDF's session is in the index yet
+        self._pages_done = 0
 
-    def set_params(self, image_paths, images_per_page, output_dir):
-        """Set parameters before running generation in a thread."""
+    def set_metrics(self, metrics):
+        """Share a session's Metrics so PDF timings land in the same report."""
+        self.metrics = metrics
+
+    def set_params(self, image_paths, images_per_page, output_dir, name=None):
+        """Set parameters before running generation in a thread.
+
+        The PDF is written as <output_dir>/<name>.pdf, capture_<timestamp>.pdf by default.
+        """
         self._image_paths = image_paths
         self._images_per_page = images_per_page
         self._output_dir = output_dir
+        self._pdf_name = name
+        self._resume_from = None
+
+    def set_ocr(self, pool):
+        """OCR frames with pool and embed their text while laying out pages."""
+        self.ocr = pool
+
+    def set_search_index(self, index):
+        """Add each OCR'd slide (text, digest, thumbnail) to index once the PDF is written."""
+        self.search_index = index
+
+    def set_journal(self, journal):
+        """Record checkpoints in journal so an interrupted compilation can resume."""
+        self.journal = journal
+        if self._canvas is not None:
+            self._record_started()
+
+    def set_resume(self, state):
+        """Continue the compilation described by a JournalState.
+
+        Segments saved before the interruption are kept; only the frames
+        after the last of them are compiled again.
+        """
+        segments = state.completed_segments()
+        done = segments[-1][1] if segments else 0
+        self._image_paths = state.frames[done:]
+        self._images_per_page = state.images_per_page
+        self._output_dir = os.path.dirname(state.pdf_path)
+        self._resume_from = (state.pdf_path, [path for path, _ in segments], done)
 
     def run_generation(self):
         """This method will be run in a separate thread."""
-        if not self._image_paths:
+        if not self._image_paths and not self._resume_from:
             self.finished.emit("Error: No images to compile.")
             return
 
-        # Create PDF filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pdf_path = os.path.join(self._output_dir, f"capture_{timestamp}.pdf")
-
+        own_pool = None
+        if self.ocr is None and self.ocr_backend is not None:
+            own_pool = OCRPool(self.ocr_workers, backend=self.ocr_backend, metrics=self.metrics)
+            own_pool.start()
+            self.ocr = own_pool
         try:
-            # Initialize PDF - Default to letter size
-            c = canvas.Canvas(pdf_path, pagesize=letter)
+            self._open_document(self._images_per_page, self._output_dir)
             total_images = len(self._image_paths)
+            if self.ocr is not None:
+                # Queue every frame so OCR runs ahead of page layout
+                for path in self._image_paths:
+                    self.ocr.submit(path)
+            prepared_frames = iter_prepared(self._image_paths, self.workers, **self._prepare_options())
+            for i, prepared in enumerate(prepared_frames):
+                self._add_to_page(prepared)
+                # Emit progress based on overall index
+                progress_percent = int(((i + 1) / max(1, total_images)) * 100)
+                self.progress_updated.emit(progress_percent)
+            pdf_path = self._close_document()
+            self.finished.emit(self._generated_message(pdf_path))
 
-            # --- Special handling for 4 or 2 images per page (custom page size) ---
-            if self._images_per_page == 4 or self._images_per_page == 2:
-                batch_size = self._images_per_page
-                for i in range(0, total_images, batch_size):
-                    batch_paths = self._image_paths[i:min(i + batch_size, total_images)]
-                    if not batch_paths:
-                        continue
-
-                    # Determine page size from the first image in the batch
-                    try:
-                        with Image.open(batch_paths[0]) as img:
-                            img_width, img_height = img.size
-                    except Exception as e:
-                        print(f"Error opening image {batch_paths[0]} to determine page size: {e}")
-                        # Fallback or skip? Let's skip this batch for now.
-                        # Emit progress for skipped images
-                        for k in range(len(batch_paths)):
-                             progress_percent = int(((i + k + 1) / total_images) * 100)
-                             self.progress_updated.emit(progress_percent)
-                        continue
-
-                    # Calculate custom page size (tightly packed)
-                    if batch_size == 4:
-                        page_width = img_width * 2
-                        page_height = img_height * 2
-                        # Define quadrant positions (0,0 is bottom-left in reportlab)
-                        # Order: Top-Left, Top-Right, Bottom-Left, Bottom-Right
-                        positions = [
-                            (0, page_height / 2),
-                            (page_width / 2, page_height / 2),
-                            (0, 0),
-                            (page_width / 2, 0)
-                        ]
-                        quad_width = page_width / 2
-                        quad_height = page_height / 2
-                    else: # batch_size == 2
-                        page_width = img_width
-                        page_height = img_height * 2
-                        # Define positions: Top, Bottom
-                        positions = [
-                            (0, page_height / 2),
-                            (0, 0)
-                        ]
-                        quad_width = page_width
-                        quad_height = page_height / 2
-
-                    c.setPageSize((page_width, page_height))
-
-                    # Draw images in the batch
-                    for j, img_path in enumerate(batch_paths):
-                        try:
-                            with Image.open(img_path) as img:
-                                # Scale image to fit quadrant
-                                width, height = img.size
-                                scale = min(quad_width / width, quad_height / height, 1.0) # Don't scale up
-                                scaled_width = width * scale
-                                scaled_height = height * scale
-
-                                # Position within quadrant (bottom-left corner of image)
-                                x, y = positions[j]
-                                # Center within quadrant (optional, for now just place at corner)
-                                # x += (quad_width - scaled_width) / 2
-                                # y += (quad_height - scaled_height) / 2
-
-                                c.drawImage(img_path, x, y, width=scaled_width, height=scaled_height)
-                        except Exception as e:
-                            print(f"Error processing image {img_path}: {e}")
-
-                        # Emit progress based on overall index
-                        progress_percent = int(((i + j + 1) / total_images) * 100)
-                        self.progress_updated.emit(progress_percent)
-
-                    c.showPage() # Finalize the custom page
-
-            # --- Handling for 1 image per page (standard letter size) ---
-            else: # self._images_per_page == 1
-                positions = [(self.margin, self.margin)]
-                max_width = self.page_width - (2 * self.margin)
-                max_height = self.page_height - (2 * self.margin)
-
-                # Process images one by one
-                for i, image_path in enumerate(self._image_paths):
-                    # Add a new page for every image
-                    if i > 0:
-                        c.showPage()
-                    # Ensure page size is letter
-                    c.setPageSize(letter)
-
-                    try:
-                        with Image.open(image_path) as img:
-                            # Calculate scaling to fit in available space
-                            width, height = img.size
-                            scale = min(max_width / width, max_height / height, 1.0) # Don't scale up
-                            scaled_width = width * scale
-                            scaled_height = height * scale
-
-                            # Center image in its allocated space
-                            x, y = positions[0] # Only one position for 1 image/page
-                            x += (max_width - scaled_width) / 2
-                            y += (max_height - scaled_height) / 2 # Center vertically too
-
-                            # Draw image
-                            c.drawImage(image_path, x, y, width=scaled_width, height=scaled_height)
-                    except Exception as e:
-                        print(f"Error processing image {image_path}: {e}")
-
-                    # Emit progress
-                    progress_percent = int(((i + 1) / total_images) * 100)
-                    self.progress_updated.emit(progress_percent)
-
-            # Save the PDF after all processing is done
-            c.save()
-            self.finished.emit(f"PDF generated: {pdf_path}")
+        except Exception as e:
+            self._canvas = None
+            self.finished.emit(f"Error generating PDF: {e}")
+        finally:
+            if own_pool is not None:
+                own_pool.close()
+                self.ocr = None
+
+    def _generated_message(self, pdf_path):
+        if self.ocr is not None:
+            return f"Searchable PDF generated: {pdf_path}"
+        return f"PDF generated: {pdf_path}"
+
+    def _prepare_options(self):
+        return {
+            "max_dimension": self.max_image_dimension,
+            "encoding": self.image_encoding,
+            "jpeg_quality": self.jpeg_quality,
+            # Search results show a preview of each indexed slide
+            "thumbnails": self.search_index is not None and self.ocr is not None,
+        }
 
+    # --- Streaming compilation: pages are laid out while capture runs ---
+
+    def begin_stream(self, images_per_page, output_dir, name=None):
+        """Open the output PDF so images can be added as they are captured."""
+        self._images_per_page = images_per_page
+        self._output_dir = output_dir
+        self._pdf_name = name
+        self._images_added = 0
+        self._open_document(images_per_page, output_dir)
+
+    def add_image(self, image_path):
+        """Lay out one captured image; completed pages are finalized immediately."""
+        if self._canvas is None:
+            return
+        self._images_added += 1
+        try:
+            # One frame at a time during capture, so prepare inline
+            prepared = prepare_frame(self._images_added - 1, image_path, **self._prepare_options())
+            self._add_to_page(prepared)
+        except Exception as e:
+            print(f"Error adding image {image_path} to PDF: {e}")
+
+    def finish_stream(self):
+        """Flush the last partial page and write the file."""
+        if self._canvas is None:
+            self.finished.emit("Error: PDF stream was not started.")
+            return
+        if not self._images_added:
+            self._canvas = None
+            self._remove_segments()
+            self.finished.emit("Error: No images to compile.")
+            return
+        try:
+            pdf_path = self._close_document()
+            self.progress_updated.emit(100)
+            self.finished.emit(self._generated_message(pdf_path))
         except Exception as e:
+            self._canvas = None
             self.finished.emit(f"Error generating PDF: {e}")
+
+    # --- Page layout shared by batch and streaming compilation ---
+
+    def _open_document(self, images_per_page, output_dir):
+        self._slot = 0  # Index of the next free position on the current page
+        self._page_layout = None
+        self._images_reused = 0
+        self._bytes_saved = 0
+        self._slides = []
+        # Slides of segments saved before a resume were indexed with them
+        self._slides_indexed = bool(self._resume_from)
+        if self._resume_from:
+            self._pdf_path, segments, self._frames_done = self._resume_from
+            self._segments = list(segments)
+            # Saved segments end on page boundaries
+            self._pages_done = self._frames_done // max(1, images_per_page)
+        else:
+            # Create PDF filename
+            name = self._pdf_name or f"capture_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            self._pdf_path = os.path.join(output_dir, name + ".pdf")
+            self._segments = []
+            self._frames_done = 0
+            self._pages_done = 0
+            self._record_started()
+        self._open_segment()
+
+    def _record(self, event, **fields):
+        if self.journal is not None:
+            self.journal.record(event, **fields)
+
+    def _record_started(self):
+        self._record("pdf_started", path=self._pdf_path, images_per_page=self._images_per_page)
+
+    def _open_segment(self):
+        path = f"{self._pdf_path}.part{len(self._segments) + 1:04d}"
+        self._segments.append(path)
+        # Initialize PDF - Default to letter size
+        self._canvas = canvas.Canvas(path, pagesize=letter)
+        self._segment_page_count = 0
+        self._segment_bytes = 0
+        self._segment_full = False
+        # Images cannot be shared across segment files
+        self._embedded = {}
+
+    def _end_page(self):
+        self._canvas.showPage() # Finalize the page
+        self.metrics.count("pdf_pages")
+        self._pages_done += 1
+        self._slot = 0
+        self._segment_page_count += 1
+        if ((self.segment_pages and self._segment_page_count >= self.segment_pages)
+                or (self.segment_bytes and self._segment_bytes >= self.segment_bytes)):
+            # Write the finished segment out and release its images
+            with self.metrics.timed("pdf_save"):
+                self._canvas.save()
+            self._segment_full = True
+            self._record("pdf_segment", path=self._segments[-1], frames=self._frames_done)
+            self._index_slides()
+
+    def _close_document(self):
+        """Save the last segment and join the segments into the final PDF.
+
+        If joining fails the segment files are left in place, so the
+        pages written so far are not lost.
+        """
+        if self._slot > 0:
+            self._end_page() # Finalize the partial last page
+        # Save the PDF after all processing is done
+        if self._segment_page_count == 0 and not self._segment_full and len(self._segments) > 1:
+            self._segments.pop()  # Nothing was drawn after the last full segment
+        elif not self._segment_full:
+            with self.metrics.timed("pdf_save"):
+                self._canvas.save()
+        self._canvas = None
+        self._embedded = {}
+        if len(self._segments) == 1:
+            os.replace(self._segments[0], self._pdf_path)
+        else:
+            with self.metrics.timed("pdf_concat"):
+                concatenate_pdfs(self._segments, self._pdf_path)
+            self._remove_segments()
+        self._segments = []
+        self._resume_from = None
+        self._record("pdf_done", path=self._pdf_path)
+        if self.ocr is not None:
+            self._record("ocr_done", path=self._pdf_path)
+        if self._images_reused:
+            print(f"PDF: {self._images_reused} duplicate images embedded once, "
+                  f"{self._bytes_saved / 1e6:.1f} MB saved")
+        self._index_slides()
+        return self._pdf_path
+
+    def _index_slides(self):
+        """Add the OCR'd slides drawn since the last call to the search index.
+
+        Called as each segment is saved, so slides are not kept in memory
+        for the whole session. The first call replaces what the index held
+        for the session before.
+        """
+        slides, self._slides = self._slides, []
+        if self.search_index is None or not slides:
+            return
+        if self.journal is not None:
+            directory = self.journal.directory
+            state = load_journal(directory)
+            frame_times = state.frame_times if state else {}
+        else:
+            first = slides[0]["frame"]
+            directory = os.path.dirname((parse_ref(first) or (first,))[0])
+            frame_times = {}
+        for slide in slides:
+            slide["captured_at"] = frame_times.get(slide["frame"])
+        try:
+            with self.metrics.timed("search_index"):
+                self.search_index.add_session(os.path.abspath(directory), self._pdf_path, slides,
+                                              replace=not self._slides_indexed)
+            self._slides_indexed = True
+        except Exception as e:
+            print(f"Warning: Could not index {self._pdf_path} for search: {e}")
+
+    def _remove_segments(self):
+        for path in self._segments:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._segments = []
+
+    def _start_page(self, first_image_size):
+        """Set the page size and return (positions, quad_width, quad_height)."""
+        c = self._canvas
+        # --- Special handling for 4 or 2 images per page (custom page size) ---
+        if self._images_per_page in (2, 4):
+            img_width, img_height = first_image_size
+            # Calculate custom page size (tightly packed)
+            if self._images_per_page == 4:
+                page_width = img_width * 2
+                page_height = img_height * 2
+                # Define quadrant positions (0,0 is bottom-left in reportlab)
+                # Order: Top-Left, Top-Right, Bottom-Left, Bottom-Right
+                positions = [
+                    (0, page_height / 2),
+                    (page_width / 2, page_height / 2),
+                    (0, 0),
+                    (page_width / 2, 0)
+                ]
+                quad_width = page_width / 2
+                quad_height = page_height / 2
+            else: # images_per_page == 2
+                page_width = img_width
+                page_height = img_height * 2
+                # Define positions: Top, Bottom
+                positions = [
+                    (0, page_height / 2),
+                    (0, 0)
+                ]
+                quad_width = page_width
+                quad_height = page_height / 2
+            c.setPageSize((page_width, page_height))
+            return positions, quad_width, quad_height
+
+        # --- Handling for 1 image per page (standard letter size) ---
+        c.setPageSize(letter)
+        positions = [(self.margin, self.margin)]
+        max_width = self.page_width - (2 * self.margin)
+        max_height = self.page_height - (2 * self.margin)
+        return positions, max_width, max_height
+
+    def _add_to_page(self, prepared):
+        """Draw one prepared image in the next free position, finishing the page when it is full."""
+        self._frames_done += 1
+        if prepared.error:
+            # Page size comes from the first image, so an unreadable one is skipped
+            print(f"Error opening image {prepared.path}: {prepared.error}")
+            return
+
+        layout_start = time.perf_counter()
+        width, height = prepared.width, prepared.height
+        if self._slot == 0:
+            if self._segment_full:
+                self._open_segment()
+            self._page_layout = self._start_page((width, height))
+        positions, box_width, box_height = self._page_layout
+
+        try:
+            # Scale image to fit its box
+            scale = min(box_width / width, box_height / height, 1.0) # Don't scale up
+            scaled_width = width * scale
+            scaled_height = height * scale
+
+            # Position within the box (bottom-left corner of image)
+            x, y = positions[self._slot]
+            if self._images_per_page not in (2, 4):
+                # Center image in its allocated space on letter pages
+                x += (box_width - scaled_width) / 2
+                y += (box_height - scaled_height) / 2
+
+            self._draw_prepared(prepared, x, y, scaled_width, scaled_height)
+            if self.ocr is not None:
+                result = self.ocr.result(prepared.path)
+                self._draw_text_layer(result, x, y, scaled_width, scaled_height)
+                self._remember_slide(prepared, result)
+        except Exception as e:
+            print(f"Error processing image {prepared.path}: {e}")
+        self.metrics.add_time("pdf_layout", time.perf_counter() - layout_start)
+
+        self._slot += 1
+        if self._slot >= len(positions):
+            self._end_page()
+
+    def _draw_prepared(self, prepared, x, y, width, height):
+        """Embed prepared's compressed pixels as an image XObject and draw it.
+
+        Equivalent to canvas.drawImage, except the data is already
+        compressed, so reportlab does not re-open, decode or re-compress it.
+        Content seen before is drawn from the existing XObject instead.
+        """
+        c = self._canvas
+        name = self._find_embedded(prepared)
+        if name is not None:
+            self._images_reused += 1
+            self._bytes_saved += len(prepared.stream)
+            self.metrics.count("pdf_images_reused")
+            self.metrics.count("pdf_bytes_saved", len(prepared.stream))
+        else:
+            name = f"frame{prepared.index}"
+            self._remember_embedded(prepared, name)
+        if not c.hasForm(name):
+            self._segment_bytes += len(prepared.stream)
+            image = pdfdoc.PDFImageXObject(name)
+            image.width = prepared.width
+            image.height = prepared.height
+            image.bitsPerComponent = 8
+            image.colorSpace = "DeviceRGB"
+            image._filters = (prepared.filter,)
+            image.streamContent = prepared.stream
+            c._doc.addForm(name, image)
+        c.saveState()
+        c.translate(x, y)
+        c.scale(width, height)
+        c.doForm(name)
+        c.restoreState()
+
+    def _find_embedded(self, prepared):
+        """Name of an already embedded XObject with the same content, or None."""
+        if not self.deduplicate:
+            return None
+        for key in (prepared.digest, prepared.near_digest):
+            if key and key in self._embedded:
+                return self._embedded[key]
+        return None
+
+    def _remember_embedded(self, prepared, name):
+        if not self.deduplicate:
+            return
+        for key in (prepared.digest, prepared.near_digest):
+            if key:
+                self._embedded.setdefault(key, name)
+
+    def _remember_slide(self, prepared, result):
+        if self.search_index is None or result is None or result.error:
+            return
+        self._slides.append({
+            "page": self._pages_done + 1,
+            "frame": prepared.path,
+            "digest": prepared.digest,
+            "thumbnail": prepared.thumbnail,
+            "text": result.text,
+        })
+
+    def _draw_text_layer(self, result, x, y, width, height):
+        """Draw result's words as invisible text over the image at (x, y, width, height)."""
+        if result is None or result.error or not result.width or not result.height:
+            if result is not None and result.error:
+                print(f"OCR failed: {result.error}")
+            return
+        scale_x = width / result.width
+        scale_y = height / result.height
+        text = self._canvas.beginText()
+        text.setTextRenderMode(3)  # Invisible, but selectable and searchable
+        for line in result.lines():
+            for i, word in enumerate(line):
+                font_size = max(1.0, word.height * scale_y)
+                natural_width = pdfmetrics.stringWidth(word.text, self.text_font, font_size)
+                if natural_width <= 0:
+                    continue
+                text.setFont(self.text_font, font_size)
+                # Stretch each word to cover its box so selections line up with the image
+                text.setHorizScale(100.0 * word.width * scale_x / natural_width)
+                text.setTextOrigin(x + word.left * scale_x, y + height - (word.top + word.height) * scale_y)
+                # Separate words with spaces and end each line with a line
+                # break (T*), so copied and extracted text keeps its layout
+                if i < len(line) - 1:
+                    text.textOut(word.text + " ")
+                else:
+                    text.textLine(word.text)
+        self._canvas.drawText(text)
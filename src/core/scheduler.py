@@ -0,0 +1,71 @@
+import time
+
+class PollScheduler:
+    """Deadline-based polling cadence for ScreenMonitor.
+
+    Ticks are scheduled against absolute deadlines, so time spent grabbing and
+    diffing is absorbed into the interval instead of added on top of it. The
+    rate drops towards min_rate while the region stays static and jumps to
+    max_rate for burst_ticks ticks after a change, so the frame following a
+    slide transition is seen quickly. Rates are in ticks per second.
+    """
+
+    def __init__(self, min_rate=1.0, max_rate=8.0, base_rate=4.0, backoff=1.25,
+                 idle_ticks=8, burst_ticks=8):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.base_rate = base_rate
+        self.backoff = backoff
+        self.idle_ticks = idle_ticks
+        self.burst_ticks = burst_ticks
+        self.reset()
+
+    def reset(self):
+        self.interval = 1.0 / self.base_rate
+        self.ticks = 0
+        self.overruns = 0
+        self._static_ticks = 0
+        self._burst_remaining = 0
+        self._deadline = time.monotonic()
+
+    @property
+    def rate(self):
+        return 1.0 / self.interval
+
+    def record(self, changed):
+        """Adjust the interval after a tick; changed is the detector's verdict."""
+        self.ticks += 1
+        if changed:
+            self.interval = 1.0 / self.max_rate
+            self._burst_remaining = self.burst_ticks
+            self._static_ticks = 0
+        elif self._burst_remaining > 0:
+            self._burst_remaining -= 1
+            if self._burst_remaining == 0:
+                self.interval = max(self.interval, 1.0 / self.base_rate)
+        else:
+            self._static_ticks += 1
+            if self._static_ticks >= self.idle_ticks:
+                self.interval = min(self.interval * self.backoff, 1.0 / self.min_rate)
+
+    def wait(self, keep_running=lambda: True, slice_seconds=0.05):
+        """Sleep until the next deadline, waking early if keep_running() turns False."""
+        self._deadline += self.interval
+        now = time.monotonic()
+        if self._deadline <= now:
+            # The tick ran past its slot: resync instead of firing a catch-up burst
+            self.overruns += 1
+            self._deadline = now
+            return
+        while keep_running():
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, slice_seconds))
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "current_rate": self.rate,
+        }
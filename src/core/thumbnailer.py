@@ -0,0 +1,135 @@
+import queue
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtGui import QImage
+
+FILMSTRIP_SIZE = (160, 100)  # Bounding box of filmstrip thumbnails, in pixels
+
+class ThumbnailCache:
+    """Least recently used QImage thumbnails, bounded by their total size in bytes.
+
+    put() evicts the oldest entries once max_bytes is exceeded; get()
+    marks an entry as recently used. Safe to share between threads.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+
+    def put(self, key, image):
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self.bytes -= old.sizeInBytes()
+            self._images[key] = image
+            self.bytes += image.sizeInBytes()
+            while self.bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self.bytes -= evicted.sizeInBytes()
+
+    def get(self, key):
+        """Return the thumbnail for key, or None if it was never made or has been evicted."""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._images
+
+    def __len__(self):
+        with self._lock:
+            return len(self._images)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.bytes = 0
+
+def scale_frame(frame, size=FILMSTRIP_SIZE):
+    """Downscale a Frame's in-memory pixels to fit size, as a QImage.
+
+    The frame is first subsampled by a whole step to at most twice the
+    target, so only a small copy is made before smooth scaling.
+    """
+    import numpy as np  # Loaded with the first capture, not with the window
+    width, height = frame.size
+    step = max(1, int(max(width / size[0], height / size[1]) // 2))
+    small = np.ascontiguousarray(frame.as_rgb(frame.pixels[::step, ::step]))
+    image = QImage(small.data, small.shape[1], small.shape[0], small.strides[0], QImage.Format.Format_RGB888)
+    # scaled() returns a new image, so nothing refers to small afterwards
+    return image.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation)
+
+class Thumbnailer(QObject):
+    """Makes filmstrip thumbnails of captured frames on a worker thread.
+
+    submit() is called from the capture loop with the frame still in
+    memory, so nothing is read back from disk, and never blocks: when the
+    worker falls behind, the oldest queued frames are dropped. Finished
+    thumbnails go into cache and thumbnail_ready(key) is emitted; receivers
+    in the GUI thread get it queued, so the window never does the scaling.
+    """
+
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(self, cache=None, size=FILMSTRIP_SIZE, max_queue=4):
+        super().__init__()
+        self.cache = cache or ThumbnailCache()
+        self.size = size
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._queue = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = threading.Thread(target=self._worker, name="thumbnailer", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, key):
+        """Queue a Frame to be thumbnailed under key (any thread)."""
+        pending = self._queue
+        if pending is None:
+            return
+        while True:
+            try:
+                pending.put_nowait((frame, key))
+                return
+            except queue.Full:
+                # A preview is not worth stalling capture for
+                try:
+                    pending.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _worker(self):
+        pending = self._queue
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            frame, key = item
+            try:
+                self.cache.put(key, scale_frame(frame, self.size))
+            except Exception as e:
+                print(f"Warning: Could not make thumbnail for {key}: {e}")
+                continue
+            self.thumbnail_ready.emit(key)
+
+    def close(self):
+        """Finish the queued frames and stop the worker thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._queue = None
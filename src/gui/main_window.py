@@ -1,14 +1,20 @@
 import sys
 import os
-import darkdetect
+import json
+import sqlite3
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QPushButton, QApplication,
                                QLabel, QSpinBox, QCheckBox, QFileDialog, QComboBox,
-                               QHBoxLayout, QGroupBox, QProgressBar)
-from PyQt6.QtCore import Qt, QSettings, QTimer, QThread
+                               QHBoxLayout, QGroupBox, QProgressBar, QMessageBox,
+                               QLineEdit, QListWidget, QListWidgetItem)
+from PyQt6.QtCore import Qt, QSettings, QSize, QTimer, QThread, QUrl, pyqtSignal
+from PyQt6.QtGui import QDesktopServices, QIcon, QPixmap
 from .region_selector import RegionSelector
-from ..core.monitor import ScreenMonitor
-from ..core.pdf_compiler import PDFCompiler
-from ..core.ocr_processor import OCRProcessor
+from ..core.thumbnailer import Thumbnailer, FILMSTRIP_SIZE
+from ..utils.encoding import EncodingPolicy, PNG, PALETTE, JPEG, AUTO
+from ..utils.journal import SessionJournal, find_unfinished_sessions
+# Capture (numpy, PIL), PDF, OCR and search modules (reportlab, sqlite
+# caches) are imported when first used, so the window appears without
+# waiting for them
 
 # Define macOS-like stylesheets
 LIGHT_STYLESHEET = """
@@ -209,6 +215,8 @@ QProgressBar::chunk {
 """
 
 class MainWindow(QMainWindow):
+    finish_pdf_stream = pyqtSignal()  # Asks the streaming compiler to flush and save
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Screen Capture to PDF")
@@ -216,15 +224,30 @@ class MainWindow(QMainWindow):
 
         self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint)
 
-        self.monitor = ScreenMonitor()
+        self.monitor = None  # Created on first use, see open_monitor()
+        self.region = None
+        self.ignore_zones = []
+        # Filmstrip previews are scaled from captured frames off the GUI thread
+        self.thumbnailer = Thumbnailer()
+        self.thumbnailer.thumbnail_ready.connect(self.add_thumbnail)
+        self.thumbnailer.start()
         self.settings = QSettings('ScreenCapturePDF', 'Settings')
         self.pdf_thread = None
         self.pdf_compiler_worker = None
         self.ocr_thread = None
         self.ocr_worker = None
+        self.ocr_pool = None  # OCRs frames during capture when tesseract is installed
+        self.ocr_cache = None  # Opened on first use; shared by every session
+        self.search_index = None  # Opened on first use, like the OCR cache
+        self.session_dir = None
+        self.session_journal = None  # Journal of the session being post-processed
+        self._resume_queue = []
+        self._stream_compiler = None  # Compiler fed by screenshot_taken until it finishes
 
         self.setup_ui()
         self.load_settings()
+        # Offer to finish sessions interrupted by a crash or early exit
+        QTimer.singleShot(0, self.check_unfinished_sessions)
 
     def setup_ui(self):
         central_widget = QWidget()
@@ -237,8 +260,14 @@ class MainWindow(QMainWindow):
         region_layout = QVBoxLayout()
         self.select_region_btn = QPushButton("Select Region")
         self.select_region_btn.clicked.connect(self.select_region)
+        self.ignore_zones_btn = QPushButton("Ignore Zones")
+        self.ignore_zones_btn.clicked.connect(self.select_ignore_zones)
+        self.ignore_zones_btn.setEnabled(False)
+        region_buttons = QHBoxLayout()
+        region_buttons.addWidget(self.select_region_btn)
+        region_buttons.addWidget(self.ignore_zones_btn)
         self.region_label = QLabel("No region selected")
-        region_layout.addWidget(self.select_region_btn)
+        region_layout.addLayout(region_buttons)
         region_layout.addWidget(self.region_label)
         region_group.setLayout(region_layout)
         layout.addWidget(region_group)
@@ -276,6 +305,44 @@ class MainWindow(QMainWindow):
         self.layout_combo.setCurrentText("4")
         layout_selection.addWidget(self.layout_combo)
 
+        ocr_selection = QHBoxLayout()
+        ocr_selection.addWidget(QLabel("OCR workers (0 = auto):"))
+        self.ocr_workers_spinbox = QSpinBox()
+        self.ocr_workers_spinbox.setRange(0, 32)
+        self.ocr_workers_spinbox.valueChanged.connect(
+            lambda value: self.settings.setValue('ocr_workers', value))
+        ocr_selection.addWidget(self.ocr_workers_spinbox)
+
+        # How captures are saved, and how they are embedded in the PDF
+        encoding_selection = QHBoxLayout()
+        encoding_selection.addWidget(QLabel("Frames:"))
+        self.encoding_combo = QComboBox()
+        self.encoding_combo.addItems([PNG, PALETTE, JPEG, AUTO])
+        self.encoding_combo.currentTextChanged.connect(
+            lambda value: self.settings.setValue('encoding', value))
+        encoding_selection.addWidget(self.encoding_combo)
+        encoding_selection.addWidget(QLabel("JPEG quality:"))
+        self.jpeg_quality_spinbox = QSpinBox()
+        self.jpeg_quality_spinbox.setRange(10, 100)
+        self.jpeg_quality_spinbox.setValue(85)
+        self.jpeg_quality_spinbox.valueChanged.connect(
+            lambda value: self.settings.setValue('jpeg_quality', value))
+        encoding_selection.addWidget(self.jpeg_quality_spinbox)
+
+        budget_selection = QHBoxLayout()
+        budget_selection.addWidget(QLabel("Session budget MB (0 = none):"))
+        self.byte_budget_spinbox = QSpinBox()
+        self.byte_budget_spinbox.setRange(0, 100000)
+        self.byte_budget_spinbox.valueChanged.connect(
+            lambda value: self.settings.setValue('byte_budget_mb', value))
+        budget_selection.addWidget(self.byte_budget_spinbox)
+        budget_selection.addWidget(QLabel("PDF images:"))
+        self.pdf_encoding_combo = QComboBox()
+        self.pdf_encoding_combo.addItems(["as captured", PNG, JPEG, AUTO])
+        self.pdf_encoding_combo.currentTextChanged.connect(
+            lambda value: self.settings.setValue('pdf_encoding', value))
+        budget_selection.addWidget(self.pdf_encoding_combo)
+
         pdf_output = QHBoxLayout()
         self.pdf_path_btn = QPushButton("PDF Output Directory")
         self.pdf_path_btn.clicked.connect(self.select_pdf_directory)
@@ -284,6 +351,9 @@ class MainWindow(QMainWindow):
         pdf_output.addWidget(self.pdf_path_label)
 
         pdf_layout.addLayout(layout_selection)
+        pdf_layout.addLayout(ocr_selection)
+        pdf_layout.addLayout(encoding_selection)
+        pdf_layout.addLayout(budget_selection)
         pdf_layout.addLayout(pdf_output)
         pdf_group.setLayout(pdf_layout)
         layout.addWidget(pdf_group)
@@ -310,13 +380,51 @@ class MainWindow(QMainWindow):
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(False)
         status_layout.addWidget(self.progress_bar)
+
+        # Live per-stage metrics, refreshed while a session is running or compiling
+        self.metrics_label = QLabel("")
+        self.metrics_label.setWordWrap(True)
+        self.metrics_label.setStyleSheet("font-size: 11px; color: #8e8e93;")
+        self.metrics_label.setVisible(False)
+        status_layout.addWidget(self.metrics_label)
+
+        # Recent captures, newest on the right
+        self.filmstrip = QListWidget()
+        self.filmstrip.setViewMode(QListWidget.ViewMode.IconMode)
+        self.filmstrip.setFlow(QListWidget.Flow.LeftToRight)
+        self.filmstrip.setWrapping(False)
+        self.filmstrip.setIconSize(QSize(*FILMSTRIP_SIZE))
+        self.filmstrip.setFixedHeight(FILMSTRIP_SIZE[1] + 30)
+        self.filmstrip.setVisible(False)
+        status_layout.addWidget(self.filmstrip)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_metrics)
         layout.addLayout(status_layout)
 
+        # Search over the OCR text of every indexed session
+        search_group = QGroupBox("Search Slides")
+        search_layout = QVBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Find slides by their text")
+        self.search_edit.textChanged.connect(lambda: self.search_timer.start(150))
+        self.search_results = QListWidget()
+        self.search_results.setVisible(False)
+        self.search_results.itemActivated.connect(self.open_search_result)
+        search_layout.addWidget(self.search_edit)
+        search_layout.addWidget(self.search_results)
+        search_group.setLayout(search_layout)
+        layout.addWidget(search_group)
+        # Search once typing pauses rather than on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self.run_search)
+
     def apply_theme(self, theme_choice):
         app = QApplication.instance()
         if not app: return
         effective_theme = theme_choice.lower()
         if effective_theme == "system":
+            import darkdetect
             system_theme = darkdetect.theme()
             effective_theme = system_theme.lower() if system_theme else "light"
         if effective_theme == "dark":
@@ -328,18 +436,72 @@ class MainWindow(QMainWindow):
     def load_settings(self):
         pdf_dir = self.settings.value('pdf_directory', 'Default')
         self.pdf_path_label.setText(pdf_dir)
+        self.ocr_workers_spinbox.setValue(int(self.settings.value('ocr_workers', 0)))
+        self.encoding_combo.setCurrentText(self.settings.value('encoding', PNG))
+        self.jpeg_quality_spinbox.setValue(int(self.settings.value('jpeg_quality', 85)))
+        self.byte_budget_spinbox.setValue(int(self.settings.value('byte_budget_mb', 0)))
+        self.pdf_encoding_combo.setCurrentText(self.settings.value('pdf_encoding', "as captured"))
         saved_theme = self.settings.value('theme', 'System')
         self.theme_combo.blockSignals(True)
         self.theme_combo.setCurrentText(saved_theme)
         self.theme_combo.blockSignals(False)
         self.apply_theme(saved_theme)
+        # Region and its ignore zones are persisted together
+        try:
+            region = json.loads(self.settings.value('region', 'null'))
+            zones = json.loads(self.settings.value('ignore_zones', '[]'))
+        except (TypeError, ValueError):
+            region, zones = None, []
+        if region:
+            self.set_region(tuple(region), [tuple(zone) for zone in zones])
+
+    def set_region(self, region, ignore_zones=None):
+        self.region = region
+        self.ignore_zones = list(ignore_zones or [])
+        if self.monitor is not None:
+            self.monitor.set_region(region)
+            self.monitor.set_ignore_zones(self.ignore_zones)
+        self.ignore_zones_btn.setEnabled(True)
+        self.update_region_label()
+        self.settings.setValue('region', json.dumps(list(region)))
+        self.settings.setValue('ignore_zones', json.dumps([list(zone) for zone in self.ignore_zones]))
+
+    def update_region_label(self):
+        region = self.region
+        text = f"Region: {region[2]}x{region[3]}"
+        if self.ignore_zones:
+            text += f" ({len(self.ignore_zones)} ignore zones)"
+        self.region_label.setText(text)
+
+    def open_monitor(self):
+        """The ScreenMonitor, created with the saved region on first use.
+
+        Capture loads numpy and PIL, which are not needed to show the window.
+        """
+        if self.monitor is None:
+            from ..core.monitor import ScreenMonitor
+            self.monitor = ScreenMonitor()
+            self.monitor.thumbnailer = self.thumbnailer
+            if self.region is not None:
+                self.monitor.set_region(self.region)
+                self.monitor.set_ignore_zones(self.ignore_zones)
+        return self.monitor
+
+    def has_region(self):
+        return self.region is not None
 
     def select_region(self):
         selector = RegionSelector()
         if selector.exec():
-            region = selector.get_region()
-            self.monitor.set_region(region)
-            self.region_label.setText(f"Region: {region[2]}x{region[3]}")
+            # Zones are relative to the old region, so a new region starts clean
+            self.set_region(selector.get_region())
+
+    def select_ignore_zones(self):
+        if not self.has_region():
+            return
+        selector = RegionSelector(self.region, self.ignore_zones)
+        if selector.exec():
+            self.set_region(self.region, selector.get_ignore_zones())
 
     def select_pdf_directory(self):
         directory = QFileDialog.getExistingDirectory(self, "Select PDF Output Directory")
@@ -348,16 +510,17 @@ class MainWindow(QMainWindow):
             self.settings.setValue('pdf_directory', directory)
 
     def start_monitoring(self):
-        if not self.monitor.has_region():
+        if not self.has_region():
             self.status_label.setText("Please select a region.")
             self.select_region()
-            if not self.monitor.has_region(): return
+            if not self.has_region(): return
 
         delay_seconds = self.timer_spinbox.value()
         if delay_seconds > 0:
             self.status_label.setText(f"Starting in {delay_seconds} seconds...")
             self.start_btn.setEnabled(False)
             self.select_region_btn.setEnabled(False)
+            self.ignore_zones_btn.setEnabled(False)
             self.countdown_timer = QTimer(self)
             self.countdown_timer.timeout.connect(self.update_countdown)
             self.countdown_remaining = delay_seconds
@@ -375,99 +538,351 @@ class MainWindow(QMainWindow):
 
     def actually_start_monitoring(self):
         images_per_page = int(self.layout_combo.currentText())
+        pdf_directory = self.pdf_path_label.text()
+        if pdf_directory == "Default":
+            pdf_directory = os.path.expanduser("~/Desktop")
+        budget_mb = self.byte_budget_spinbox.value()
+        self.open_monitor().writer.encoding = EncodingPolicy(
+            self.encoding_combo.currentText(), jpeg_quality=self.jpeg_quality_spinbox.value(),
+            byte_budget=budget_mb * 1024 * 1024 if budget_mb else None)
+        # The compiler must be listening before the first capture arrives
+        self.start_pdf_stream(images_per_page, pdf_directory)
         self.monitor.start(
             images_per_page=images_per_page,
-            pdf_directory=self.pdf_path_label.text()
+            pdf_directory=pdf_directory
         )
+        self.pdf_compiler_worker.set_journal(self.monitor.journal)
+        self.layout_combo.setEnabled(False)
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.select_region_btn.setEnabled(False)
+        self.ignore_zones_btn.setEnabled(False)
         self.status_label.setText("Monitoring...")
+        self.metrics_label.setVisible(True)
+        self.filmstrip.clear()
+        self.thumbnailer.cache.clear()
+        self.metrics_timer.start(1000)
+
+    def start_pdf_stream(self, images_per_page, pdf_directory):
+        """Start a compiler thread that lays out PDF pages as screenshots are taken."""
+        from ..core.pdf_compiler import PDFCompiler
+        self.pdf_thread = QThread()
+        self.pdf_compiler_worker = PDFCompiler()
+        self.pdf_compiler_worker.set_metrics(self.monitor.metrics)
+        self.set_pdf_encoding(self.pdf_compiler_worker)
+        self.pdf_compiler_worker.set_ocr(self.start_ocr_pool())
+        self.pdf_compiler_worker.set_search_index(self.open_search_index())
+        self.pdf_compiler_worker.begin_stream(images_per_page, pdf_directory)
+        self.pdf_compiler_worker.moveToThread(self.pdf_thread)
+        if self.ocr_pool:
+            # Direct connection: frames are queued for OCR from the writer threads
+            self.monitor.screenshot_taken.connect(self.ocr_pool.submit, Qt.ConnectionType.DirectConnection)
+
+        # Queued connections: add_image and finish_stream run on the compiler thread, in order
+        self.monitor.screenshot_taken.connect(self.pdf_compiler_worker.add_image)
+        self.finish_pdf_stream.connect(self.pdf_compiler_worker.finish_stream)
+        self._stream_compiler = self.pdf_compiler_worker
+        self.pdf_compiler_worker.progress_updated.connect(self.update_pdf_progress)
+        self.pdf_compiler_worker.finished.connect(self.pdf_generation_finished)
+        self.pdf_compiler_worker.finished.connect(self.pdf_thread.quit)
+        self.pdf_thread.finished.connect(self.pdf_thread.deleteLater)
+        self.pdf_thread.finished.connect(self.pdf_compiler_worker.deleteLater)
+
+        self.pdf_thread.start()
+
+    def set_pdf_encoding(self, compiler):
+        pdf_encoding = self.pdf_encoding_combo.currentText()
+        compiler.image_encoding = None if pdf_encoding == "as captured" else pdf_encoding
+        compiler.jpeg_quality = self.jpeg_quality_spinbox.value()
+
+    def start_ocr_pool(self):
+        """Start a pool that OCRs frames during capture, or return None without an OCR backend.
+
+        Without a backend the PDF is written image-only and ocrmypdf adds the
+        text layer afterwards.
+        """
+        from ..core.ocr_pool import OCRPool
+        from ..core.ocr_backends import default_backend
+        from ..utils.ocr_cache import OCRCache
+        self.stop_ocr_pool()
+        backend = default_backend()
+        if backend is None:
+            return None
+        if self.ocr_cache is None:
+            try:
+                self.ocr_cache = OCRCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Warning: OCR cache unavailable: {e}")
+        self.ocr_pool = OCRPool(workers=self.ocr_workers_spinbox.value() or None, backend=backend,
+                                metrics=self.monitor.metrics, cache=self.ocr_cache)
+        self.ocr_pool.start()
+        return self.ocr_pool
+
+    def open_search_index(self):
+        if self.search_index is None:
+            from ..utils.search_index import SearchIndex
+            try:
+                self.search_index = SearchIndex()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Warning: Search index unavailable: {e}")
+        return self.search_index
+
+    def run_search(self):
+        self.search_results.clear()
+        text = self.search_edit.text().strip()
+        index = self.open_search_index() if text else None
+        if index is None:
+            self.search_results.setVisible(False)
+            return
+        try:
+            hits = index.search(text)
+        except sqlite3.Error as e:
+            print(f"Warning: Search failed: {e}")
+            hits = []
+        for hit in hits:
+            item = QListWidgetItem(f"{os.path.basename(hit.pdf_path)}, page {hit.page}: {hit.snippet}")
+            item.setData(Qt.ItemDataRole.UserRole, hit.pdf_path)
+            item.setToolTip(hit.thumbnail or hit.frame)
+            self.search_results.addItem(item)
+        if not hits:
+            self.search_results.addItem("No matching slides")
+        self.search_results.setVisible(True)
+
+    def open_search_result(self, item):
+        pdf_path = item.data(Qt.ItemDataRole.UserRole)
+        if pdf_path:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(pdf_path))
+
+    def stop_ocr_pool(self):
+        if self.ocr_pool is not None:
+            self.ocr_pool.close()
+            self.ocr_pool = None
+
+    def add_thumbnail(self, key):
+        """Append a capture's thumbnail to the filmstrip (queued from the thumbnailer thread)."""
+        image = self.thumbnailer.cache.get(key)
+        if image is None:
+            return  # Already evicted by newer captures
+        item = QListWidgetItem(QIcon(QPixmap.fromImage(image)), "")
+        item.setData(Qt.ItemDataRole.UserRole, key)
+        item.setToolTip(os.path.basename(key))
+        self.filmstrip.addItem(item)
+        # The strip holds no more captures than the size-bounded cache
+        while self.filmstrip.count() and self.filmstrip.item(0).data(Qt.ItemDataRole.UserRole) not in self.thumbnailer.cache:
+            self.filmstrip.takeItem(0)
+        self.filmstrip.scrollToItem(item)
+        self.filmstrip.setVisible(True)
+
+    def update_metrics(self):
+        text = self.monitor.metrics.summary_text()
+        if self.monitor.isRunning():
+            text += f" · queue {self.monitor.writer.queue_depth()}"
+        self.metrics_label.setText(text)
+
+    def dump_metrics(self):
+        """Write the session's metrics.json next to its captures."""
+        if self.session_dir:
+            self.monitor.metrics.dump(os.path.join(self.session_dir, "metrics.json"))
 
     def stop_monitoring(self):
-        captured_images = self.monitor.get_captured_images()
         self.monitor.stop()
-
-        if captured_images:
-            self.status_label.setText("Preparing PDF generation...")
+        # Read after stop(): frames still queued are flushed by then
+        captured = self.monitor.captured_count
+        self.session_dir = self.monitor.output_dir
+        self.session_journal = self.monitor.journal
+        self.dump_metrics()
+        self.update_metrics()
+
+        # Pages were laid out during capture; only the last partial page is left.
+        # OCR submissions are direct calls, so none are pending once stop() returns
+        if self.ocr_pool:
+            self.monitor.screenshot_taken.disconnect(self.ocr_pool.submit)
+        if captured:
+            self.status_label.setText("Finalizing PDF...")
             self.progress_bar.setValue(0)
             self.progress_bar.setVisible(True)
             self.start_btn.setEnabled(False)
             self.stop_btn.setEnabled(False)
             self.select_region_btn.setEnabled(False)
+            self.ignore_zones_btn.setEnabled(False)
 
-            self.pdf_thread = QThread()
-            self.pdf_compiler_worker = PDFCompiler()
-            self.pdf_compiler_worker.set_params(
-                captured_images,
-                int(self.layout_combo.currentText()),
-                self.pdf_path_label.text()
-            )
-            self.pdf_compiler_worker.moveToThread(self.pdf_thread)
-
-            self.pdf_thread.started.connect(self.pdf_compiler_worker.run_generation)
-            self.pdf_compiler_worker.progress_updated.connect(self.update_pdf_progress)
-            self.pdf_compiler_worker.finished.connect(self.pdf_generation_finished)
-            self.pdf_compiler_worker.finished.connect(self.pdf_thread.quit)
-            self.pdf_thread.finished.connect(self.pdf_thread.deleteLater)
-            self.pdf_thread.finished.connect(self.pdf_compiler_worker.deleteLater)
-
-            self.pdf_thread.start()
-            self.status_label.setText("Generating PDF...")
+            # add_image calls still queued on the compiler thread run before
+            # finish_stream; the stream is disconnected once it reports back
+            self.finish_pdf_stream.emit()
         else:
             self.start_btn.setEnabled(True)
+            self.layout_combo.setEnabled(True)
             self.stop_btn.setEnabled(False)
             self.select_region_btn.setEnabled(True)
+            self.ignore_zones_btn.setEnabled(self.has_region())
             self.status_label.setText("Monitoring stopped. No images captured.")
+            self.metrics_timer.stop()
+            # Nothing to compile: discard the open stream
+            self.disconnect_pdf_stream()
+            self.pdf_thread.quit()
+            self.close_session("no images")
+
+    def disconnect_pdf_stream(self):
+        """Detach the streaming compiler from the monitor (no-op for resumed sessions)."""
+        compiler, self._stream_compiler = self._stream_compiler, None
+        if compiler is None:
+            return
+        self.monitor.screenshot_taken.disconnect(compiler.add_image)
+        self.finish_pdf_stream.disconnect(compiler.finish_stream)
 
     def update_pdf_progress(self, value):
         self.progress_bar.setValue(value)
 
     def pdf_generation_finished(self, result_message):
+        self.disconnect_pdf_stream()
+        self.dump_metrics()
         if result_message.startswith("Error:"):
             self.progress_bar.setVisible(False)
             self.status_label.setText(result_message)
+            self.metrics_timer.stop()
             self.start_btn.setEnabled(True)
+            self.layout_combo.setEnabled(True)
             self.stop_btn.setEnabled(False)
             self.select_region_btn.setEnabled(True)
-        else:
-            self.status_label.setText("Performing OCR...")
+            self.ignore_zones_btn.setEnabled(self.has_region())
+            self.close_session(result_message)
+        elif result_message.startswith("Searchable PDF generated: "):
+            # Frames were OCR'd during capture and the text layer is already embedded
             self.progress_bar.setVisible(False)
-
+            self.ocr_finished(result_message)
+        else:
             try:
                 original_pdf_path = result_message.split("PDF generated: ", 1)[1]
             except IndexError:
                 self.status_label.setText("Error: Could not parse PDF path for OCR.")
+                self.metrics_timer.stop()
                 self.start_btn.setEnabled(True)
+                self.layout_combo.setEnabled(True)
                 self.stop_btn.setEnabled(False)
                 self.select_region_btn.setEnabled(True)
+                self.ignore_zones_btn.setEnabled(self.has_region())
+                self.close_session("Error: Could not parse PDF path for OCR.")
                 return
+            self.start_ocr(original_pdf_path)
 
-            pdf_dir = os.path.dirname(original_pdf_path)
-            pdf_filename = os.path.basename(original_pdf_path)
-            ocr_output_path = os.path.join(pdf_dir, f"OCR_{pdf_filename}")
+    def start_ocr(self, original_pdf_path):
+        """Run OCR on a generated PDF in a worker thread."""
+        from ..core.ocr_processor import OCRProcessor
+        self.status_label.setText("Performing OCR...")
+        self.progress_bar.setVisible(False)
 
-            self.ocr_thread = QThread()
-            self.ocr_worker = OCRProcessor()
-            self.ocr_worker.set_params(original_pdf_path, ocr_output_path)
-            self.ocr_worker.moveToThread(self.ocr_thread)
+        pdf_dir = os.path.dirname(original_pdf_path)
+        pdf_filename = os.path.basename(original_pdf_path)
+        ocr_output_path = os.path.join(pdf_dir, f"OCR_{pdf_filename}")
 
-            self.ocr_thread.started.connect(self.ocr_worker.run_ocr)
-            self.ocr_worker.finished.connect(self.ocr_finished)
-            self.ocr_worker.finished.connect(self.ocr_thread.quit)
-            self.ocr_thread.finished.connect(self.ocr_thread.deleteLater)
-            self.ocr_thread.finished.connect(self.ocr_worker.deleteLater)
+        self.ocr_thread = QThread()
+        self.ocr_worker = OCRProcessor()
+        self.ocr_worker.set_metrics(self.open_monitor().metrics)
+        self.ocr_worker.set_journal(self.session_journal)
+        self.ocr_worker.jobs = self.ocr_workers_spinbox.value() or None
+        self.ocr_worker.set_params(original_pdf_path, ocr_output_path)
+        self.ocr_worker.moveToThread(self.ocr_thread)
 
-            self.ocr_thread.start()
+        self.ocr_thread.started.connect(self.ocr_worker.run_ocr)
+        self.ocr_worker.finished.connect(self.ocr_finished)
+        self.ocr_worker.finished.connect(self.ocr_thread.quit)
+        self.ocr_thread.finished.connect(self.ocr_thread.deleteLater)
+        self.ocr_thread.finished.connect(self.ocr_worker.deleteLater)
+
+        self.ocr_thread.start()
 
     def ocr_finished(self, result_message):
+        self.metrics_timer.stop()
+        self.update_metrics()
+        self.dump_metrics()
         self.status_label.setText(result_message)
         self.start_btn.setEnabled(True)
+        self.layout_combo.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.select_region_btn.setEnabled(True)
+        self.ignore_zones_btn.setEnabled(self.has_region())
+        self.close_session(result_message)
+
+    def close_session(self, status):
+        """Mark the session's journal finished, then resume the next queued session."""
+        self.stop_ocr_pool()
+        if self.session_journal is not None:
+            self.session_journal.record("closed", status=status)
+            self.session_journal.close()
+            self.session_journal = None
+        self.resume_next_session()
+
+    # --- Resuming sessions interrupted during PDF generation or OCR ---
+
+    def check_unfinished_sessions(self):
+        pdf_directory = self.pdf_path_label.text()
+        if pdf_directory == "Default":
+            pdf_directory = os.path.expanduser("~/Desktop")
+        sessions = find_unfinished_sessions(pdf_directory)
+        if not sessions:
+            return
+        answer = QMessageBox.question(
+            self, "Unfinished Sessions",
+            f"{len(sessions)} capture session(s) were interrupted before their PDF or OCR finished.\n"
+            "Resume them now? Discard marks them as finished without processing.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Discard)
+        if answer == QMessageBox.StandardButton.Yes:
+            self._resume_queue = sessions
+            self.resume_next_session()
+        elif answer == QMessageBox.StandardButton.Discard:
+            for state in sessions:
+                journal = SessionJournal(state.directory)
+                journal.record("closed", status="discarded")
+                journal.close()
+
+    def resume_next_session(self):
+        """Continue post-processing of the next interrupted session, if any."""
+        if not self._resume_queue or (self.monitor is not None and self.monitor.isRunning()):
+            return
+        state = self._resume_queue.pop(0)
+        self.session_journal = SessionJournal(state.directory)
+        self.session_dir = None  # Keep the interrupted session's own metrics.json
+        self.start_btn.setEnabled(False)
+        self.layout_combo.setEnabled(False)
+        self.stop_btn.setEnabled(False)
+        self.select_region_btn.setEnabled(False)
+        self.ignore_zones_btn.setEnabled(False)
+        name = os.path.basename(state.directory)
+        if not state.needs_pdf():
+            self.start_ocr(state.pdf_path)
+            self.status_label.setText(f"Resuming OCR for {name}...")
+            return
+
+        from ..core.pdf_compiler import PDFCompiler
+        self.status_label.setText(f"Resuming PDF for {name}...")
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.pdf_thread = QThread()
+        self.pdf_compiler_worker = PDFCompiler()
+        self.pdf_compiler_worker.set_metrics(self.open_monitor().metrics)
+        self.set_pdf_encoding(self.pdf_compiler_worker)
+        self.pdf_compiler_worker.set_journal(self.session_journal)
+        self.pdf_compiler_worker.set_ocr(self.start_ocr_pool())
+        self.pdf_compiler_worker.set_search_index(self.open_search_index())
+        if state.pdf_path:
+            self.pdf_compiler_worker.set_resume(state)
+        else:
+            self.pdf_compiler_worker.set_params(state.frames, state.images_per_page,
+                                                os.path.dirname(state.directory))
+        self.pdf_compiler_worker.moveToThread(self.pdf_thread)
+
+        self.pdf_thread.started.connect(self.pdf_compiler_worker.run_generation)
+        self.pdf_compiler_worker.progress_updated.connect(self.update_pdf_progress)
+        self.pdf_compiler_worker.finished.connect(self.pdf_generation_finished)
+        self.pdf_compiler_worker.finished.connect(self.pdf_thread.quit)
+        self.pdf_thread.finished.connect(self.pdf_thread.deleteLater)
+        self.pdf_thread.finished.connect(self.pdf_compiler_worker.deleteLater)
+
+        self.pdf_thread.start()
 
     def closeEvent(self, event):
-        self.monitor.stop()
+        if self.monitor is not None:
+            self.monitor.stop()
         if self.pdf_thread and self.pdf_thread.isRunning():
             print("Warning: Closing while PDF generation is in progress.")
             self.pdf_thread.quit()
@@ -476,4 +891,8 @@ class MainWindow(QMainWindow):
             print("Warning: Closing while OCR is in progress.")
             self.ocr_thread.quit()
             self.ocr_thread.wait(500)
+        if self.ocr_pool is not None:
+            # Unfinished work is resumed from the session journal on the next launch
+            self.ocr_pool.cancel()
+        self.thumbnailer.close()
         event.accept()
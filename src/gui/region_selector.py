@@ -3,8 +3,11 @@ from PyQt6.QtCore import Qt, QRect, QPoint, QSize
 from PyQt6.QtGui import QPainter, QColor, QScreen, QFont
 
 class RegionSelector(QDialog):
-    def __init__(self):
+    def __init__(self, region=None, ignore_zones=None):
         super().__init__()
+        # With a region given, the selector draws ignore zones inside it instead
+        self.zone_region = region
+        self.ignore_zones = list(ignore_zones or [])
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setStyleSheet("background:transparent;")
@@ -24,6 +27,8 @@ class RegionSelector(QDialog):
         self.info_label.setStyleSheet("background-color: rgba(0, 0, 0, 180); color: white; padding: 5px; border-radius: 3px;")
         self.info_label.setFont(QFont("Arial", 10))
         self.info_label.hide()
+        if self.zone_region:
+            self.show_zone_help()
         
         # Set cursor to crosshair
         self.setCursor(Qt.CursorShape.CrossCursor)
@@ -36,6 +41,10 @@ class RegionSelector(QDialog):
         painter.setBrush(QColor(0, 0, 0, 100))
         painter.drawRect(self.rect())
         
+        if self.zone_region:
+            self.paint_zones(painter)
+            return
+        
         if not self.is_selecting:
             return
             
@@ -63,6 +72,46 @@ class RegionSelector(QDialog):
         # Update info label with dimensions
         self.update_info_label(region)
     
+    def paint_zones(self, painter):
+        # Monitored region is shown clear, ignore zones tinted red on top
+        rx, ry, rw, rh = self.zone_region
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+        painter.drawRect(rx, ry, rw, rh)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        painter.setBrush(QColor(255, 59, 48, 110))
+        zones = list(self.ignore_zones)
+        if self.is_selecting:
+            zone = self.get_zone()
+            if zone:
+                zones.append(zone)
+        for x, y, w, h in zones:
+            painter.drawRect(rx + x, ry + y, w, h)
+    
+    def show_zone_help(self):
+        self.info_label.setText(f"Drag to add ignore zones ({len(self.ignore_zones)}) · "
+                                "Enter to accept · Backspace to undo · Esc to cancel")
+        label_size = self.info_label.sizeHint()
+        rx, ry, rw, rh = self.zone_region
+        label_y = ry - label_size.height() - 5 if ry > label_size.height() + 10 else ry + rh + 5
+        self.info_label.setGeometry(rx + (rw - label_size.width()) // 2, label_y,
+                                    label_size.width(), label_size.height())
+        self.info_label.show()
+    
+    def get_zone(self):
+        """Current drag as an (x, y, w, h) zone clipped to and relative to the region."""
+        rx, ry, rw, rh = self.zone_region
+        x, y, w, h = self.get_region()
+        left = max(x, rx)
+        top = max(y, ry)
+        right = min(x + w, rx + rw)
+        bottom = min(y + h, ry + rh)
+        if right - left < 2 or bottom - top < 2:
+            return None
+        return (left - rx, top - ry, right - left, bottom - top)
+    
+    def get_ignore_zones(self):
+        return list(self.ignore_zones)
+    
     def update_info_label(self, region):
         # Update the info label with dimensions
         width = region[2]
@@ -94,6 +143,14 @@ class RegionSelector(QDialog):
         self.update()
     
     def mouseReleaseEvent(self, event):
+        if self.zone_region:
+            zone = self.get_zone()
+            self.is_selecting = False
+            if zone:
+                self.ignore_zones.append(zone)
+            self.show_zone_help()
+            self.update()
+            return
         self.is_selecting = False
         if self.begin and self.end:
             # Only accept if we have a valid selection (non-zero area)
@@ -119,3 +176,10 @@ class RegionSelector(QDialog):
         # Allow canceling with Escape key
         if event.key() == Qt.Key.Key_Escape:
             self.reject()
+        elif self.zone_region and event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            self.accept()
+        elif self.zone_region and event.key() in (Qt.Key.Key_Backspace, Qt.Key.Key_Delete):
+            if self.ignore_zones:
+                self.ignore_zones.pop()
+                self.show_zone_help()
+                self.update()
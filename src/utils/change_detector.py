@@ -0,0 +1,153 @@
+import numpy as np
+
+# Number of values processed per strip; keeps scratch buffers around 1 MB
+STRIP_VALUES = 1 << 18
+# Sampled levels smaller than this are too noisy to decide on; small frames
+# go straight to the (cheap) exact check
+MIN_SAMPLE_VALUES = 4096
+
+class ChangeDetector:
+    """Decides whether two frames differ by more than an MSE threshold.
+
+    Decides exactly as comparing the full-frame mean squared error against
+    mse_threshold would, without a float pass:
+
+    * All arithmetic is integer (uint8 -> int16 diff -> int32 square,
+      int64 sum), processed in row strips through reusable scratch buffers.
+    * The pass stops as soon as the running sum exceeds the budget, so a
+      large change is detected after the first few strips. "No change"
+      always needs the whole frame.
+
+    Optional sampled levels (e.g. levels=(16, 4)) first compare strided
+    subsamples, coarsest first: a sample MSE upper times the threshold
+    reports a change, and one below lower times it on the finest level
+    reports no change. This is faster on static frames but only an
+    estimate: changes made of thin lines or isolated pixels between the
+    sampled rows and columns are missed, and ones on them over-counted.
+    Set lower=None to keep the sampled change exit only.
+
+    An optional ignore mask (True = ignored pixel) excludes regions such as
+    clocks or video insets. It is precomputed per pyramid level and applied
+    as an integer weight inside the vectorized diff; the MSE is taken over
+    the remaining pixels only.
+
+    A detector keeps scratch buffers between calls and is not thread-safe;
+    give each thread its own instance.
+    """
+
+    def __init__(self, mse_threshold=500, levels=(), lower=0.25, upper=4.0):
+        self.mse_threshold = mse_threshold
+        self.levels = levels
+        self.lower = lower
+        self.upper = upper
+        self._scratch = {}
+        self._mask_shape = None
+        self._keep = {}  # step -> (int32 weights with a channel axis, kept pixel count)
+
+    def set_ignore_mask(self, ignore):
+        """Set a (height, width) boolean mask of pixels to ignore, or None."""
+        self._keep = {}
+        self._mask_shape = None
+        if ignore is None or not np.any(ignore):
+            return
+        keep = (~np.asarray(ignore, dtype=bool)).astype(np.int32)
+        self._mask_shape = keep.shape
+        for step in tuple(self.levels) + (1,):
+            level = np.ascontiguousarray(keep[::step, ::step])
+            self._keep[step] = (level[:, :, None], int(level.sum()))
+
+    def _level_keep(self, arr, step):
+        """Mask weights for a pyramid level, or (None, None) if no mask applies."""
+        if self._mask_shape is None or arr.shape[:2] != self._mask_shape:
+            return None, None
+        return self._keep[step]
+
+    def is_different(self, img1, img2):
+        """Return True if the frames are significantly different."""
+        if img1 is None or img2 is None:
+            return True
+
+        arr1 = np.asarray(img1)
+        arr2 = np.asarray(img2)
+        if arr1.shape != arr2.shape:
+            return True
+
+        channels = arr1.shape[2] if arr1.ndim == 3 else 1
+        for i, step in enumerate(self.levels):
+            sample1 = arr1[::step, ::step]
+            sample2 = arr2[::step, ::step]
+            keep, kept_pixels = self._level_keep(arr1, step)
+            count = sample1.size if keep is None else kept_pixels * channels
+            if count < MIN_SAMPLE_VALUES:
+                continue
+            upper_budget = self.upper * self.mse_threshold * count
+            sse, exceeded = self._sse(sample1, sample2, upper_budget, keep)
+            if exceeded:
+                return True
+            # Only the finest sampled level is dense enough to rule a change out
+            if (self.lower is not None and i == len(self.levels) - 1
+                    and sse <= self.lower * self.mse_threshold * count):
+                return False
+
+        # Exact full-resolution check (or a borderline sampled estimate)
+        keep, kept_pixels = self._level_keep(arr1, 1)
+        count = arr1.size if keep is None else kept_pixels * channels
+        if count == 0:
+            return False
+        _, exceeded = self._sse(arr1, arr2, self.mse_threshold * count, keep)
+        return exceeded
+
+    def _sse(self, arr1, arr2, budget, keep=None):
+        """Integer sum of squared differences, stopping once it exceeds budget."""
+        height = arr1.shape[0]
+        row_values = arr1[0].size
+        rows = max(1, STRIP_VALUES // max(1, row_values))
+        diff_buf, sq_buf = self._buffers(arr1.shape[1:], rows)
+
+        total = 0
+        for top in range(0, height, rows):
+            strip1 = arr1[top:top + rows]
+            strip2 = arr2[top:top + rows]
+            n = strip1.shape[0]
+            diff = diff_buf[:n]
+            sq = sq_buf[:n]
+            np.subtract(strip1, strip2, out=diff, dtype=np.int16)
+            np.multiply(diff, diff, out=sq, dtype=np.int32)
+            if keep is not None:
+                sq *= keep[top:top + rows] if sq.ndim == 3 else keep[top:top + rows, :, 0]
+            total += int(sq.sum(dtype=np.int64))
+            if total > budget:
+                return total, True
+        return total, False
+
+    def _buffers(self, row_shape, rows):
+        key = (row_shape, rows)
+        buffers = self._scratch.get(key)
+        if buffers is None:
+            shape = (rows,) + tuple(row_shape)
+            buffers = (np.empty(shape, dtype=np.int16), np.empty(shape, dtype=np.int32))
+            self._scratch[key] = buffers
+        return buffers
+
+def mask_from_zones(zones, frame_size, region_size=None):
+    """Build a (height, width) ignore mask from (x, y, w, h) zones.
+
+    Zones are relative to the monitored region in region_size coordinates
+    and are scaled to frame_size, which differs on high-DPI screens.
+    """
+    width, height = frame_size
+    ignore = np.zeros((height, width), dtype=bool)
+    if not zones:
+        return ignore
+    scale_x = scale_y = 1.0
+    if region_size and region_size[0] and region_size[1]:
+        scale_x = width / region_size[0]
+        scale_y = height / region_size[1]
+    for x, y, w, h in zones:
+        left = max(0, int(x * scale_x))
+        top = max(0, int(y * scale_y))
+        right = min(width, int(round((x + w) * scale_x)))
+        bottom = min(height, int(round((y + h) * scale_y)))
+        if right > left and bottom > top:
+            ignore[top:bottom, left:right] = True
+    return ignore
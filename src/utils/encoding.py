@@ -0,0 +1,112 @@
+import io
+import threading
+
+# Frame encodings
+PNG = "png"            # lossless RGB PNG
+PALETTE = "palette"    # 256-colour palette PNG (lossless for frames with few colours)
+JPEG = "jpeg"          # lossy, for photo-heavy frames
+AUTO = "auto"          # pick one of the above per frame from its colours
+
+EXTENSIONS = {PNG: ".png", PALETTE: ".png", JPEG: ".jpg"}
+
+PNG_COMPRESS_LEVEL = 6  # Pillow's default
+PALETTE_COLORS = 256
+# AUTO treats a frame as a photo when more than this fraction of a
+# subsample's pixels have distinct colours
+PHOTO_COLOR_RATIO = 0.25
+SAMPLE_SIZE = 256
+# Quality used once a session's byte budget is exhausted
+MIN_JPEG_QUALITY = 50
+
+def classify(image, palette_colors=PALETTE_COLORS):
+    """Pick PALETTE, PNG or JPEG for an RGB image from its colour count."""
+    from PIL import Image  # The GUI imports this module for its constants only
+    if image.getcolors(palette_colors) is not None:
+        return PALETTE  # Every colour fits in the palette, so nothing is lost
+    width, height = image.size
+    scale = min(1.0, SAMPLE_SIZE / max(width, height))
+    sample = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.NEAREST)
+    limit = int(sample.width * sample.height * PHOTO_COLOR_RATIO)
+    if sample.getcolors(max(limit, palette_colors)) is None:
+        return JPEG
+    return PNG
+
+class EncodingPolicy:
+    """Chooses and applies the encoding of each saved frame.
+
+    mode is one of PNG, PALETTE, JPEG or AUTO. With a byte_budget the
+    session degrades as the budget fills: past half of it lossless PNG
+    frames are palette-quantised and JPEG quality falls towards
+    MIN_JPEG_QUALITY; once it is spent every frame is written as JPEG at
+    MIN_JPEG_QUALITY. Frames are never dropped for the budget.
+    encode() may be called from several writer threads.
+    """
+
+    def __init__(self, mode=PNG, jpeg_quality=85, palette_colors=PALETTE_COLORS, byte_budget=None):
+        self.mode = mode
+        self.jpeg_quality = jpeg_quality
+        self.palette_colors = palette_colors
+        self.byte_budget = byte_budget
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.bytes_used = 0
+            self.mode_counts = {}
+            self._budget_warned = False
+
+    def budget_used(self):
+        """Fraction of the byte budget spent (0.0 without a budget)."""
+        if not self.byte_budget:
+            return 0.0
+        with self._lock:
+            return self.bytes_used / self.byte_budget
+
+    def choose(self, image):
+        """Return (mode, jpeg_quality) for image under the current budget."""
+        mode = classify(image, self.palette_colors) if self.mode == AUTO else self.mode
+        quality = self.jpeg_quality
+        used = self.budget_used()
+        if used >= 1.0:
+            return JPEG, min(quality, MIN_JPEG_QUALITY)
+        if used >= 0.5:
+            if mode == PNG:
+                mode = PALETTE
+            # Scale quality down linearly over the second half of the budget
+            pressure = (used - 0.5) * 2
+            quality = int(quality - (quality - MIN_JPEG_QUALITY) * pressure)
+        return mode, quality
+
+    def encode(self, image, compress_level=PNG_COMPRESS_LEVEL):
+        """Encode an RGB image; returns (buffer, extension, mode)."""
+        mode, quality = self.choose(image)
+        buffer = io.BytesIO()
+        if mode == JPEG:
+            image.save(buffer, format="JPEG", quality=quality)
+        elif mode == PALETTE:
+            image.quantize(self.palette_colors).save(buffer, format="PNG", compress_level=compress_level)
+        else:
+            image.save(buffer, format="PNG", compress_level=compress_level)
+        self._record(mode, buffer.tell())
+        return buffer, EXTENSIONS[mode], mode
+
+    def _record(self, mode, size):
+        with self._lock:
+            self.bytes_used += size
+            self.mode_counts[mode] = self.mode_counts.get(mode, 0) + 1
+            over = self.byte_budget and self.bytes_used >= self.byte_budget and not self._budget_warned
+            if over:
+                self._budget_warned = True
+        if over:
+            print(f"Warning: Capture byte budget of {self.byte_budget / 1e6:.1f} MB reached; "
+                  f"saving remaining frames as JPEG quality {MIN_JPEG_QUALITY}.")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "encoding": self.mode,
+                "encoded_bytes": self.bytes_used,
+                "byte_budget": self.byte_budget,
+                "frames_by_encoding": dict(self.mode_counts),
+            }
@@ -0,0 +1,151 @@
+import hashlib
+import io
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from .encoding import AUTO, JPEG, classify
+from .session_store import open_frame, parse_ref, read_frame_bytes
+
+THUMBNAIL_SIZE = 256  # Longest side of search result thumbnails, in pixels
+
+class PreparedFrame:
+    """A capture decoded once and compressed, ready to embed in a PDF.
+
+    stream holds the compressed RGB pixels (PDF image XObject data) and
+    filter its PDF filter, FlateDecode or DCTDecode (JPEG), so the canvas
+    writer never opens or decodes the file itself. error is set instead
+    when the file could not be read.
+
+    digest identifies the exact pixels; near_digest identifies them after
+    dropping the low bits of every channel, so captures that differ only by
+    encoder or capture noise share it. thumbnail is the path of a small
+    JPEG preview, when one was asked for and could be written.
+    """
+
+    def __init__(self, index, path, width=0, height=0, stream=b"", error=None,
+                 digest=None, near_digest=None, filter="FlateDecode", thumbnail=None):
+        self.index = index
+        self.path = path
+        self.width = width
+        self.height = height
+        self.stream = stream
+        self.filter = filter
+        self.error = error
+        self.digest = digest
+        self.near_digest = near_digest
+        self.thumbnail = thumbnail
+
+# Low bits dropped per channel for near_digest; 0 disables near matching
+NEAR_QUANTIZE_BITS = 3
+
+def content_digests(img, quantize_bits=NEAR_QUANTIZE_BITS):
+    """Return (exact, near) hex digests of an RGB image's pixels."""
+    header = f"{img.width}x{img.height}:".encode()
+    exact = hashlib.sha1(header + img.tobytes()).hexdigest()
+    if quantize_bits <= 0:
+        return exact, None
+    mask = 0xFF & ~((1 << quantize_bits) - 1)
+    quantized = img.point([v & mask for v in range(256)] * 3)
+    near = hashlib.sha1(header + quantized.tobytes()).hexdigest()
+    return exact, near
+
+def thumbnail_path(ref):
+    """Where the thumbnail of a frame (file path or store reference) is written."""
+    parsed = parse_ref(ref)
+    if parsed is None:
+        directory, name = os.path.split(os.path.splitext(ref)[0])
+    else:
+        store, frame_index = parsed
+        directory = os.path.dirname(store)
+        name = f"{os.path.basename(store)}_{frame_index}"
+    return os.path.join(directory, "thumbs", name + ".jpg")
+
+def write_thumbnail(img, ref):
+    """Save a THUMBNAIL_SIZE preview of an RGB image; return its path, or None on failure."""
+    path = thumbnail_path(ref)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        small = img.copy()
+        small.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.LANCZOS)
+        small.save(path, format="JPEG", quality=80)
+    except OSError as e:
+        print(f"Warning: Could not write thumbnail {path}: {e}")
+        return None
+    return path
+
+def prepare_frame(index, path, max_dimension=None, compress_level=6,
+                  quantize_bits=NEAR_QUANTIZE_BITS, encoding=None, jpeg_quality=85,
+                  thumbnails=False):
+    """Decode path once, optionally downscale, hash and compress its pixels.
+
+    encoding selects the embedded form: None keeps the capture's own
+    (JPEG files are embedded as-is, anything else losslessly), JPEG
+    re-encodes at jpeg_quality, AUTO chooses JPEG only for photo-like
+    frames, and any other encoding embeds losslessly. With thumbnails, a
+    small preview is also written to thumbnail_path(path).
+
+    Runs in worker processes, so it must stay importable without Qt.
+    """
+    try:
+        with open_frame(path) as img:
+            source_format = img.format
+            passthrough = source_format == "JPEG" and img.mode == "RGB"
+            img = img.convert("RGB")
+            resized = bool(max_dimension and max(img.size) > max_dimension)
+            if resized:
+                img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            width, height = img.size
+            digest, near_digest = content_digests(img, quantize_bits)
+            thumbnail = write_thumbnail(img, path) if thumbnails else None
+            if encoding is None:
+                use_jpeg = source_format == "JPEG"
+            else:
+                use_jpeg = encoding == JPEG or (encoding == AUTO and classify(img) == JPEG)
+            if use_jpeg and passthrough and not resized and encoding is None:
+                # Already JPEG: embed the file's bytes without re-encoding
+                stream = read_frame_bytes(path)
+                return PreparedFrame(index, path, width, height, stream, digest=digest,
+                                     near_digest=near_digest, filter="DCTDecode", thumbnail=thumbnail)
+            if use_jpeg:
+                buffer = io.BytesIO()
+                img.save(buffer, format="JPEG", quality=jpeg_quality)
+                return PreparedFrame(index, path, width, height, buffer.getvalue(), digest=digest,
+                                     near_digest=near_digest, filter="DCTDecode", thumbnail=thumbnail)
+            stream = zlib.compress(img.tobytes(), compress_level)
+        return PreparedFrame(index, path, width, height, stream, digest=digest,
+                             near_digest=near_digest, thumbnail=thumbnail)
+    except Exception as e:
+        return PreparedFrame(index, path, error=str(e))
+
+def _prepare_task(args):
+    index, path, options = args
+    return prepare_frame(index, path, **options)
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+def iter_prepared(paths, workers=None, window=None, **options):
+    """Yield PreparedFrames for paths in order, preparing them across a process pool.
+
+    options are passed on to prepare_frame. At most window frames are in
+    flight, which bounds memory on long sessions. workers=1 prepares
+    inline without starting a pool.
+    """
+    workers = workers or default_workers()
+    tasks = ((i, path, options) for i, path in enumerate(paths))
+    if workers <= 1 or len(paths) <= 1:
+        for task in tasks:
+            yield _prepare_task(task)
+        return
+
+    window = window or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_prepare_task, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,50 @@
+from .perceptual_hash import hamming_distance
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes using Hamming distance.
+
+    Stores (hash, value) pairs and answers "nearest hash within d bits"
+    queries while visiting only a small fraction of the entries.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, hash_value, value):
+        node = [hash_value, value, {}]
+        self._size += 1
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            distance = hamming_distance(hash_value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def find(self, hash_value, max_distance):
+        """Return all (distance, value) pairs within max_distance, nearest first."""
+        matches = []
+        if self._root is None:
+            return matches
+        stack = [self._root]
+        while stack:
+            node_hash, node_value, children = stack.pop()
+            distance = hamming_distance(hash_value, node_hash)
+            if distance <= max_distance:
+                matches.append((distance, node_value))
+            # Triangle inequality: only subtrees in this band can match
+            low = distance - max_distance
+            high = distance + max_distance
+            for child_distance, child in children.items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+        matches.sort(key=lambda match: match[0])
+        return matches
@@ -2,68 +2,142 @@ from PIL import Image
 import numpy as np
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QRect
+from .change_detector import ChangeDetector
 
-def get_screenshot(region):
-    """Capture a screenshot of the specified region."""
+class BufferView(np.ndarray):
+    """An ndarray over memory owned by another object (e.g. a QImage), kept alive via owner.
+
+    Slices and views of it reach it through their base and copy owner,
+    so no array derived from a grab can outlive the buffer it reads.
+    """
+
+    def __array_finalize__(self, obj):
+        self.owner = getattr(obj, "owner", None)
+
+class Frame:
+    """A captured frame kept in its native pixel layout.
+
+    pixels is an (height, width, 3) uint8 view in the capture's own channel
+    order (channel_order is "RGB" or "BGR") and may be strided, e.g. straight
+    over a QImage's BGRA buffer. Change detection runs on it directly; an
+    RGB PIL Image is only built by to_image() when the frame is saved.
+    """
+
+    def __init__(self, pixels, channel_order="RGB", raw=None, raw_mode=None, owner=None, stride=None):
+        self.pixels = pixels
+        self.channel_order = channel_order
+        self._raw = raw            # (height, bytes_per_line) buffer backing pixels
+        self._raw_mode = raw_mode  # PIL raw decoder for _raw, e.g. "BGRX"
+        # Bytes per row of _raw; set explicitly when _raw is a flat slice of a larger image
+        self._stride = stride if stride is not None else (raw.shape[1] if raw is not None else None)
+        self._owner = owner        # Keeps the buffer's owner (QImage) alive
+        self._image = None
+
+    @classmethod
+    def from_image(cls, image):
+        frame = cls(np.asarray(image.convert("RGB")))
+        if image.mode == "RGB":
+            frame._image = image
+        return frame
+
+    @property
+    def size(self):
+        return self.pixels.shape[1], self.pixels.shape[0]
+
+    def crop(self, left, top, width, height):
+        """A Frame showing a rectangle of this one, sharing its pixels (no copy)."""
+        frame_width, frame_height = self.size
+        width = max(0, min(width, frame_width - left))
+        height = max(0, min(height, frame_height - top))
+        pixels = self.pixels[top:top + height, left:left + width]
+        if self._raw is None or not width or not height:
+            return Frame(pixels, self.channel_order, owner=self._owner)
+        # The raw decoder walks rows by stride, so a flat slice from the
+        # rectangle's first byte to its last is enough for to_image()
+        bytes_per_pixel = len(self._raw_mode)  # "BGRX" or "RGB"
+        start = top * self._stride + left * bytes_per_pixel
+        end = start + (height - 1) * self._stride + width * bytes_per_pixel
+        raw = self._raw.reshape(-1)[start:end]
+        return Frame(pixels, self.channel_order, raw, self._raw_mode, self._owner, self._stride)
+
+    def as_rgb(self, array):
+        """View an RGB array in this frame's channel order (no copy)."""
+        return array[:, :, ::-1] if self.channel_order == "BGR" else array
+
+    def to_image(self):
+        """Materialise (once) an RGB PIL Image of the frame."""
+        if self._image is None:
+            if self._raw is not None:
+                self._image = Image.frombuffer("RGB", self.size, self._raw, "raw",
+                                               self._raw_mode, self._stride, 1)
+            else:
+                rgb = self.pixels[:, :, ::-1] if self.channel_order == "BGR" else self.pixels
+                self._image = Image.fromarray(np.ascontiguousarray(rgb))
+        return self._image
+
+def qimage_to_frame(qimage):
+    """Wrap a QImage's pixel buffer in a Frame without copying it."""
+    if qimage.format() not in (qimage.Format.Format_RGB32, qimage.Format.Format_ARGB32,
+                               qimage.Format.Format_ARGB32_Premultiplied, qimage.Format.Format_RGB888):
+        # Uncommon formats are converted once into a layout we can view directly
+        qimage = qimage.convertToFormat(qimage.Format.Format_RGB32)
+
+    width = qimage.width()
+    height = qimage.height()
+    bytes_per_line = qimage.bytesPerLine()
+    ptr = qimage.constBits()
+    ptr.setsize(bytes_per_line * height)
+    raw = np.frombuffer(ptr, np.uint8).reshape((height, bytes_per_line)).view(BufferView)
+    raw.owner = qimage
+
+    if qimage.format() == qimage.Format.Format_RGB888:
+        # Sliced from raw (not built on its buffer) so the view's base keeps the QImage
+        pixels = raw[:, :width * 3].reshape((height, width, 3)).view(np.ndarray)
+        return Frame(pixels, "RGB", raw, "RGB", qimage)
+
+    # 32-bit formats are stored as BGRA in memory on little-endian machines;
+    # the view skips alpha through its strides instead of copying channels
+    pixels = raw[:, :width * 4].reshape((height, width, 4))[:, :, :3].view(np.ndarray)
+    return Frame(pixels, "BGR", raw, "BGRX", qimage)
+
+def grab_frame(region):
+    """Capture the specified region as a Frame."""
     if not region:
         return None
-        
+
     x, y, width, height = region
     screen = QApplication.primaryScreen()
     screenshot = screen.grabWindow(0, x, y, width, height)
-    
-    # Convert to PIL Image
-    buffer = screenshot.toImage()
-    size = buffer.size()
-    ptr = buffer.bits()
-    # Ensure the size is correct for the buffer format
-    bytes_per_line = buffer.bytesPerLine()
-    num_bytes = bytes_per_line * size.height()
-    ptr.setsize(num_bytes)
-    
-    # Create numpy array
-    arr = np.frombuffer(ptr, np.uint8).reshape((size.height(), bytes_per_line))
-    
-    # Determine the number of channels based on format
-    # Common formats might be Format_RGB32 (BGRA) or Format_ARGB32 (BGRA)
-    # We need to extract RGB correctly
-    if buffer.format() in (buffer.Format.Format_RGB32, buffer.Format.Format_ARGB32, buffer.Format.Format_ARGB32_Premultiplied):
-        # Assuming BGRA format based on common Qt behavior
-        # Slice to remove alpha and swap B and R channels
-        arr = arr[:, :size.width() * 4].reshape((size.height(), size.width(), 4))
-        rgb_arr = arr[:, :, [2, 1, 0]] # Select B, G, R and reorder to R, G, B
-    elif buffer.format() == buffer.Format.Format_RGB888:
-        # Assuming RGB format
-        arr = arr[:, :size.width() * 3].reshape((size.height(), size.width(), 3))
-        rgb_arr = arr # Already RGB
-    else:
-        # Fallback or handle other formats if necessary
-        print(f"Warning: Unhandled QImage format {buffer.format()}. Attempting default conversion.")
-        # Default attempt, might have wrong colors
-        arr = arr[:, :size.width() * 4].reshape((size.height(), size.width(), 4))
-        rgb_arr = arr[:, :, :3]
-
-    return Image.fromarray(rgb_arr)
+    return qimage_to_frame(screenshot.toImage())
+
+def union_region(regions):
+    """Smallest (x, y, w, h) rectangle containing every region."""
+    left = min(x for x, _, _, _ in regions)
+    top = min(y for _, y, _, _ in regions)
+    right = max(x + w for x, _, w, _ in regions)
+    bottom = max(y + h for _, y, _, h in regions)
+    return left, top, right - left, bottom - top
+
+def grab_frames(regions):
+    """Capture several regions with one grab of their bounding box.
+
+    Returns a Frame per region, each a view into the shared grab.
+    """
+    bounds = union_region(regions)
+    frame = grab_frame(bounds)
+    # On high-DPI screens the grab is in device pixels, not logical ones
+    scale = frame.size[0] / bounds[2] if bounds[2] else 1
+    return [frame.crop(round((x - bounds[0]) * scale), round((y - bounds[1]) * scale),
+                       round(w * scale), round(h * scale))
+            for x, y, w, h in regions]
+
+def get_screenshot(region):
+    """Capture a screenshot of the specified region."""
+    frame = grab_frame(region)
+    return frame.to_image() if frame is not None else None
 
 def compare_images(img1, img2, threshold=0.95):
     """Compare two images and return True if they are significantly different."""
-    if img1 is None or img2 is None:
-        return True
-        
-    # Convert to numpy arrays and calculate difference
-    arr1 = np.array(img1)
-    arr2 = np.array(img2)
-    
-    if arr1.shape != arr2.shape:
-        return True
-    
-    # Calculate Mean Squared Error (MSE)
-    err = np.sum((arr1.astype("float") - arr2.astype("float")) ** 2)
-    err /= float(arr1.shape[0] * arr1.shape[1] * arr1.shape[2]) # Divide by total number of pixel values (width * height * channels)
-    
-    # Define an MSE threshold for difference (lower = more sensitive)
-    # Increased from 100 to 500 to make it less sensitive
-    mse_threshold = 500 
-    
-    # If MSE is above the threshold, images are considered different
-    return err > mse_threshold
+    # Mean Squared Error above 500 counts as different (lower = more sensitive).
+    # ChangeDetector reaches the same decision without a full-frame float pass.
+    return ChangeDetector(mse_threshold=500).is_different(img1, img2)
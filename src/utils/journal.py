@@ -0,0 +1,144 @@
+import glob
+import json
+import os
+import threading
+import time
+
+JOURNAL_NAME = "journal.jsonl"
+
+# Events after which the journal is fsync'ed: losing them would redo finished work
+CHECKPOINT_EVENTS = ("capture_stopped", "pdf_segment", "pdf_done", "ocr_done", "closed")
+
+class SessionJournal:
+    """Append-only record of a capture session and its post-processing.
+
+    One JSON object per line in <capture_dir>/journal.jsonl:
+
+    * session          - capture settings (images_per_page, pdf_enabled)
+    * frame            - a capture reached disk (path, time)
+    * revisit          - a capture was recorded as a reference to path
+    * capture_stopped  - the capture loop ended normally
+    * pdf_started      - the PDF being compiled (path, images_per_page)
+    * pdf_segment      - a segment file was saved; frames = frames it covers
+    * pdf_done / ocr_done - a stage finished (path)
+    * closed           - the pipeline reached a final state (status)
+
+    A session without a closed event was interrupted; load_journal()
+    rebuilds its state so compilation and OCR can resume. record() may be
+    called from several threads.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a")
+
+    def record(self, event, **fields):
+        fields["event"] = event
+        fields.setdefault("time", time.time())
+        line = json.dumps(fields)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            if event in CHECKPOINT_EVENTS:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+class JournalState:
+    """What a journal says about a session: frames and finished stages."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.images_per_page = 1
+        self.pdf_enabled = True
+        self.frames = []
+        self.frame_times = {}  # frame path -> capture time
+        self.capture_stopped = False
+        self.pdf_path = None
+        self.segments = []  # (segment path, frames covered), in order
+        self.pdf_done = False
+        self.ocr_done = False
+        self.ocr_path = None
+        self.closed = False
+
+    def completed_segments(self):
+        """Leading segments whose files are still on disk."""
+        kept = []
+        for path, frames in self.segments:
+            if not os.path.exists(path):
+                break
+            kept.append((path, frames))
+        return kept
+
+    def needs_pdf(self):
+        return self.pdf_enabled and bool(self.frames) and not self.pdf_done
+
+    def needs_ocr(self):
+        return self.pdf_done and not self.ocr_done and bool(self.pdf_path) and os.path.exists(self.pdf_path)
+
+    def resumable(self):
+        return not self.closed and (self.needs_pdf() or self.needs_ocr())
+
+def load_journal(directory):
+    """Rebuild a JournalState from directory's journal, or None if it has none."""
+    path = os.path.join(directory, JOURNAL_NAME)
+    if not os.path.exists(path):
+        return None
+    state = JournalState(directory)
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # Torn last line from a crash
+            event = entry.get("event")
+            if event == "session":
+                state.images_per_page = entry.get("images_per_page", 1)
+                state.pdf_enabled = entry.get("pdf_enabled", True)
+            elif event == "frame":
+                state.frames.append(entry["path"])
+                state.frame_times[entry["path"]] = entry.get("time")
+            elif event == "capture_stopped":
+                state.capture_stopped = True
+            elif event == "pdf_started":
+                # A restarted compilation replaces any earlier checkpoints
+                state.pdf_path = entry["path"]
+                state.images_per_page = entry.get("images_per_page", state.images_per_page)
+                state.segments = []
+                state.pdf_done = False
+                state.ocr_done = False
+                # A recompile of a finished session is unfinished until it closes again
+                state.closed = False
+            elif event == "pdf_segment":
+                state.segments.append((entry["path"], entry["frames"]))
+            elif event == "pdf_done":
+                state.pdf_done = True
+                state.pdf_path = entry["path"]
+            elif event == "ocr_done":
+                state.ocr_done = True
+                state.ocr_path = entry.get("path")
+            elif event == "closed":
+                state.closed = True
+    return state
+
+def find_unfinished_sessions(pdf_directory):
+    """JournalStates of interrupted capture_* sessions under pdf_directory, newest first."""
+    sessions = []
+    for directory in sorted(glob.glob(os.path.join(pdf_directory, "capture_*")), reverse=True):
+        if not os.path.isdir(directory):
+            continue
+        try:
+            state = load_journal(directory)
+        except (OSError, KeyError):
+            continue
+        if state is not None and state.resumable():
+            sessions.append(state)
+    return sessions
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (ms) of the tick latency histogram buckets; the last is open-ended
+TICK_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class Metrics:
+    """Thread-safe per-stage timers and counters for one capture session.
+
+    Stages (grab, diff, encode, write, pdf_layout, ocr, ...) accumulate
+    call count, total and max seconds. Counters hold plain totals such as
+    captures or bytes_written. snapshot() adds the derived rates shown in
+    the UI and written to the session's metrics.json.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._counters = {}
+            self._tick_buckets = [0] * (len(TICK_BUCKETS_MS) + 1)
+            self._started = time.time()
+            self._stopped = None
+
+    def start_session(self):
+        self.reset()
+
+    def stop_session(self):
+        with self._lock:
+            self._stopped = time.time()
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe_tick(self, seconds):
+        """Record the working time of one monitor tick (excluding the wait)."""
+        ms = seconds * 1000
+        index = len(TICK_BUCKETS_MS)
+        for i, bound in enumerate(TICK_BUCKETS_MS):
+            if ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self._tick_buckets[index] += 1
+        self.add_time("tick", seconds)
+
+    def tick_percentile(self, fraction):
+        """Approximate tick latency percentile in ms (bucket upper bound)."""
+        with self._lock:
+            buckets = list(self._tick_buckets)
+        total = sum(buckets)
+        if not total:
+            return 0.0
+        running = 0
+        for i, n in enumerate(buckets):
+            running += n
+            if running >= fraction * total:
+                return float(TICK_BUCKETS_MS[i]) if i < len(TICK_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        with self._lock:
+            stages = {name: {"count": count, "total_seconds": total, "max_seconds": peak,
+                             "avg_seconds": total / count if count else 0.0}
+                      for name, (count, total, peak) in self._stages.items()}
+            counters = dict(self._counters)
+            buckets = list(self._tick_buckets)
+            elapsed = (self._stopped or time.time()) - self._started
+
+        minutes = elapsed / 60 if elapsed > 0 else 0
+        pages = counters.get("pdf_pages", 0)
+        pdf_seconds = stages.get("pdf_layout", {}).get("total_seconds", 0.0) + \
+            stages.get("pdf_save", {}).get("total_seconds", 0.0)
+        ocr_seconds = stages.get("ocr", {}).get("total_seconds", 0.0)
+        histogram = {f"<={bound}ms": n for bound, n in zip(TICK_BUCKETS_MS, buckets)}
+        histogram[f">{TICK_BUCKETS_MS[-1]}ms"] = buckets[-1]
+        return {
+            "session_seconds": elapsed,
+            "stages": stages,
+            "counters": counters,
+            "tick_latency_histogram": histogram,
+            "tick_p50_ms": self.tick_percentile(0.5),
+            "tick_p95_ms": self.tick_percentile(0.95),
+            "captures_per_minute": counters.get("captures", 0) / minutes if minutes else 0.0,
+            "pages_per_second": pages / pdf_seconds if pdf_seconds else 0.0,
+            "ocr_seconds_per_page": ocr_seconds / pages if pages and ocr_seconds else 0.0,
+        }
+
+    def summary_text(self):
+        """One-line live summary for the main window."""
+        snap = self.snapshot()
+        counters = snap["counters"]
+        text = (f"Ticks {counters.get('ticks', 0)} · p50 {snap['tick_p50_ms']:.0f} ms"
+                f" · p95 {snap['tick_p95_ms']:.0f} ms · {snap['captures_per_minute']:.1f} captures/min"
+                f" · {counters.get('bytes_written', 0) / 1e6:.1f} MB")
+        if counters.get("pdf_pages"):
+            text += f" · {snap['pages_per_second']:.1f} pages/s"
+        if snap["ocr_seconds_per_page"]:
+            text += f" · OCR {snap['ocr_seconds_per_page']:.1f} s/page"
+        return text
+
+    def dump(self, path):
+        """Write the snapshot as JSON; failures are reported, not raised."""
+        try:
+            with open(path, "w") as f:
+                json.dump(self.snapshot(), f, indent=2)
+        except OSError as e:
+            print(f"Warning: Could not write metrics file {path}: {e}")
@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from .frame_prep import content_digests
+from .session_store import open_frame
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def default_cache_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "slidesnap", "ocr_cache.sqlite3")
+
+def frame_digests(path):
+    """(exact, near) content digests of a frame's pixels, as used for the cache key."""
+    with open_frame(path) as img:
+        return content_digests(img.convert("RGB"))
+
+class OCRCache:
+    """Persistent OCR results keyed by frame content, with LRU eviction by size.
+
+    Entries are looked up by the exact pixel digest first and then by the
+    near digest, so a recapture that differs only by noise reuses the
+    earlier result. The key also includes the engine and language. Once the
+    stored results exceed max_bytes, the least recently used entries are
+    removed. Safe to share between threads.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS ocr (
+            key TEXT PRIMARY KEY, near TEXT, result TEXT, size INTEGER, last_used REAL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ocr_near ON ocr (near)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ocr_last_used ON ocr (last_used)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace, digest, near_digest=None):
+        """Return the cached result dict for a frame, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT key, result FROM ocr WHERE key = ?",
+                                   (f"{namespace}:{digest}",)).fetchone()
+            if row is None and near_digest:
+                row = self._db.execute("SELECT key, result FROM ocr WHERE near = ? LIMIT 1",
+                                       (f"{namespace}:{near_digest}",)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE ocr SET last_used = ? WHERE key = ?", (time.time(), row[0]))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[1])
+
+    def put(self, namespace, digest, near_digest, result):
+        data = json.dumps(result)
+        key = f"{namespace}:{digest}"
+        with self._lock:
+            old = self._db.execute("SELECT size FROM ocr WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO ocr VALUES (?, ?, ?, ?, ?)",
+                             (key, f"{namespace}:{near_digest}" if near_digest else None,
+                              data, len(data), time.time()))
+            self._total += len(data) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of max_bytes."""
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT key, size FROM ocr ORDER BY last_used").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((key,))
+            self._total -= size
+        self._db.executemany("DELETE FROM ocr WHERE key = ?", doomed)
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM ocr").fetchone()[0]
+            return {"entries": entries, "bytes": self._total, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM ocr")
+            self._db.commit()
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
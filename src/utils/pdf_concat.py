@@ -0,0 +1,106 @@
+import re
+
+_OBJ_RE = re.compile(rb"(\d+)\s+0\s+obj\s*")
+_REF_RE = re.compile(rb"(\d+) 0 R")
+_STREAM_OR_END_RE = re.compile(rb"stream\r?\n|endobj")
+_LENGTH_RE = re.compile(rb"/Length (\d+)")
+
+def _read_xref(data):
+    """Return {object number: offset} from a classic (uncompressed) xref table."""
+    start = int(data[data.rindex(b"startxref") + len(b"startxref"):].split()[0])
+    lines = data[start:data.index(b"trailer", start)].split(b"\n")[1:]
+    offsets = {}
+    number = 0
+    for line in lines:
+        fields = line.split()
+        if len(fields) == 2:
+            number = int(fields[0])  # Start of a subsection
+        elif len(fields) == 3:
+            if fields[2] == b"n":
+                offsets[number] = int(fields[0])
+            number += 1
+    return offsets
+
+def _read_object(data, offset):
+    """Return (header, stream) for the object at offset; stream is None for plain objects."""
+    match = _OBJ_RE.match(data, offset)
+    body_start = match.end()
+    marker = _STREAM_OR_END_RE.search(data, body_start)
+    if marker.group(0) == b"endobj":
+        return data[body_start:marker.start()].rstrip(), None
+    header = data[body_start:marker.start()].rstrip()
+    length = int(_LENGTH_RE.search(header).group(1))
+    return header, data[marker.end():marker.end() + length]
+
+def _trailer_ref(data, key):
+    trailer = data[data.rindex(b"trailer"):]
+    return int(re.search(rb"/" + key + rb" (\d+) 0 R", trailer).group(1))
+
+def concatenate_pdfs(segment_paths, output_path):
+    """Join PDF segments written by reportlab into one document.
+
+    Only what PDFCompiler writes is supported: classic xref tables and a
+    single Pages node per segment. Segments are read one at a time, so
+    memory use is bounded by the largest segment. Returns the page count.
+    """
+    pages_number = 1    # Reserved for the combined page tree
+    catalog_number = 2  # Written last, once all pages are known
+    next_number = 3
+    offsets = {}
+    kids = []
+
+    with open(output_path, "wb") as out:
+        out.write(b"%PDF-1.3\n%\xe2\xe3\xcf\xd3\n")
+        for path in segment_paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            xref = _read_xref(data)
+            root = _trailer_ref(data, b"Root")
+            info = _trailer_ref(data, b"Info")
+            catalog, _ = _read_object(data, xref[root])
+            tree = int(re.search(rb"/Pages (\d+) 0 R", catalog).group(1))
+            tree_header, _ = _read_object(data, xref[tree])
+            page_refs = [int(n) for n in _REF_RE.findall(
+                re.search(rb"/Kids \[([^\]]*)\]", tree_header).group(1))]
+
+            # The segment's catalog, info and page tree are replaced by ours
+            renumber = {}
+            for number in sorted(xref):
+                if number not in (root, info, tree):
+                    renumber[number] = next_number
+                    next_number += 1
+            renumber[tree] = pages_number
+
+            def _ref(match):
+                return b"%d 0 R" % renumber[int(match.group(1))]
+
+            for number in sorted(xref):
+                if number not in renumber or number == tree:
+                    continue
+                header, stream = _read_object(data, xref[number])
+                offsets[renumber[number]] = out.tell()
+                out.write(b"%d 0 obj\n" % renumber[number])
+                out.write(_REF_RE.sub(_ref, header))
+                if stream is not None:
+                    out.write(b"\nstream\n")
+                    out.write(stream)
+                    out.write(b"\nendstream")
+                out.write(b"\nendobj\n")
+            kids.extend(renumber[n] for n in page_refs)
+            del data
+
+        offsets[pages_number] = out.tell()
+        kid_refs = b" ".join(b"%d 0 R" % n for n in kids)
+        out.write(b"%d 0 obj\n<< /Count %d /Kids [ %s ] /Type /Pages >>\nendobj\n"
+                  % (pages_number, len(kids), kid_refs))
+        offsets[catalog_number] = out.tell()
+        out.write(b"%d 0 obj\n<< /PageMode /UseNone /Pages %d 0 R /Type /Catalog >>\nendobj\n"
+                  % (catalog_number, pages_number))
+
+        xref_start = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % next_number)
+        for number in range(1, next_number):
+            out.write(b"%010d 00000 n \n" % offsets[number])
+        out.write(b"trailer\n<< /Root %d 0 R /Size %d >>\nstartxref\n%d\n%%%%EOF\n"
+                  % (catalog_number, next_number, xref_start))
+    return len(kids)
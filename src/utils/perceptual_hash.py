@@ -0,0 +1,45 @@
+import numpy as np
+
+HASH_SIZE = 8
+DCT_SIZE = 32
+SAMPLE_SIZE = 128
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis as an n x n matrix."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+_DCT = _dct_matrix(DCT_SIZE)
+
+def phash(image):
+    """64-bit DCT perceptual hash of an image (PIL Image or HxWxC array).
+
+    The frame is point-sampled to a 128x128 grid, box-filtered down to 32x32
+    grayscale, and the signs of the low 8x8 DCT coefficients relative to
+    their median become the hash bits. Similar frames land a few bits apart.
+    """
+    arr = np.asarray(image)
+    height, width = arr.shape[:2]
+    rows = np.linspace(0, height - 1, SAMPLE_SIZE).astype(np.intp)
+    cols = np.linspace(0, width - 1, SAMPLE_SIZE).astype(np.intp)
+    sample = arr[rows[:, None], cols[None, :]]
+    if sample.ndim == 3:
+        gray = sample[:, :, :3].mean(axis=2)
+    else:
+        gray = sample.astype(np.float64)
+    factor = SAMPLE_SIZE // DCT_SIZE
+    small = gray.reshape(DCT_SIZE, factor, DCT_SIZE, factor).mean(axis=(1, 3))
+
+    coeffs = (_DCT @ small @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].ravel()
+    # Skip the DC term when picking the median so flat frames stay stable
+    bits = coeffs > np.median(coeffs[1:])
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
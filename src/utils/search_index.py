@@ -0,0 +1,166 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+def default_index_path():
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "slidesnap", "search_index.sqlite3")
+
+def fts_query(text):
+    """Turn free text into an FTS5 query matching slides that contain every word (as a prefix)."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+class SearchHit:
+    """One slide matching a search."""
+
+    def __init__(self, session, pdf_path, page, frame, thumbnail, captured_at, snippet):
+        self.session = session
+        self.pdf_path = pdf_path
+        self.page = page
+        self.frame = frame
+        self.thumbnail = thumbnail
+        self.captured_at = captured_at
+        self.snippet = snippet
+
+class SearchIndex:
+    """Full-text index of the OCR'd slides of every finished session.
+
+    Each session is stored once, with per-slide OCR text, content digest,
+    capture time and thumbnail path; text lives in an SQLite FTS5 table,
+    so a query over all sessions is answered without opening any PDF.
+    add_session() replaces what was stored for a session before, or adds
+    to it, so indexing is incremental: only slides that were just
+    compiled are written.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY, directory TEXT UNIQUE, pdf_path TEXT, indexed_at REAL);
+            CREATE TABLE IF NOT EXISTS slides (
+                id INTEGER PRIMARY KEY, session INTEGER, page INTEGER, frame TEXT,
+                digest TEXT, captured_at REAL, thumbnail TEXT);
+            CREATE INDEX IF NOT EXISTS slides_session ON slides (session);
+            CREATE VIRTUAL TABLE IF NOT EXISTS slide_text USING fts5 (text);
+        """)
+        self._db.commit()
+
+    def add_session(self, directory, pdf_path, slides, replace=True):
+        """Store a session's slides, replacing any earlier entry for directory.
+
+        slides is a list of dicts with page, frame, digest, captured_at,
+        thumbnail and text. Slides without text are skipped. With
+        replace=False they are added to the slides already stored.
+        """
+        with self._lock, self._db:
+            row = None
+            if replace:
+                self._forget(directory)
+            else:
+                row = self._db.execute("SELECT id FROM sessions WHERE directory = ?", (directory,)).fetchone()
+            if row is None:
+                cursor = self._db.execute("INSERT INTO sessions (directory, pdf_path, indexed_at) VALUES (?, ?, ?)",
+                                          (directory, pdf_path, time.time()))
+                session = cursor.lastrowid
+            else:
+                session = row[0]
+                self._db.execute("UPDATE sessions SET pdf_path = ?, indexed_at = ? WHERE id = ?",
+                                 (pdf_path, time.time(), session))
+            for slide in slides:
+                if not slide.get("text"):
+                    continue
+                cursor = self._db.execute(
+                    "INSERT INTO slides (session, page, frame, digest, captured_at, thumbnail) VALUES (?, ?, ?, ?, ?, ?)",
+                    (session, slide["page"], slide["frame"], slide.get("digest"),
+                     slide.get("captured_at"), slide.get("thumbnail")))
+                self._db.execute("INSERT INTO slide_text (rowid, text) VALUES (?, ?)",
+                                 (cursor.lastrowid, slide["text"]))
+
+    def forget(self, directory):
+        """Remove a session from the index."""
+        with self._lock, self._db:
+            self._forget(directory)
+
+    def _forget(self, directory):
+        row = self._db.execute("SELECT id FROM sessions WHERE directory = ?", (directory,)).fetchone()
+        if row is None:
+            return
+        self._db.execute("DELETE FROM slide_text WHERE rowid IN (SELECT id FROM slides WHERE session = ?)", row)
+        self._db.execute("DELETE FROM slides WHERE session = ?", row)
+        self._db.execute("DELETE FROM sessions WHERE id = ?", row)
+
+    def is_indexed(self, directory):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM sessions WHERE directory = ?",
+                                    (directory,)).fetchone() is not None
+
+    def search(self, text, limit=50):
+        """Return SearchHits for slides containing every word of text, best matches first."""
+        query = fts_query(text)
+        if not query:
+            return []
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT sessions.directory, sessions.pdf_path, slides.page, slides.frame, slides.thumbnail,
+                       slides.captured_at, snippet(slide_text, 0, '[', ']', '...', 12)
+                FROM slide_text
+                JOIN slides ON slides.id = slide_text.rowid
+                JOIN sessions ON sessions.id = slides.session
+                WHERE slide_text MATCH ?
+                ORDER BY bm25(slide_text), slides.captured_at DESC
+                LIMIT ?""", (query, limit)).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            sessions = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            slides = self._db.execute("SELECT COUNT(*) FROM slides").fetchone()[0]
+        return {"sessions": sessions, "slides": slides}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the OCR text of captured slides.")
+    parser.add_argument("--index", help="index database (default: %(default)s)", default=default_index_path())
+    sub = parser.add_subparsers(dest="command", required=True)
+    query = sub.add_parser("query", help="list slides containing every word of the query")
+    query.add_argument("words", nargs="+")
+    query.add_argument("--limit", type=int, default=20)
+    sub.add_parser("info", help="print the number of indexed sessions and slides")
+    forget = sub.add_parser("forget", help="remove a capture session from the index")
+    forget.add_argument("directory")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(args.index)
+    try:
+        if args.command == "query":
+            start = time.perf_counter()
+            hits = index.search(" ".join(args.words), args.limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            for hit in hits:
+                when = datetime.fromtimestamp(hit.captured_at).strftime("%Y-%m-%d %H:%M") if hit.captured_at else "?"
+                print(f"{hit.pdf_path}  page {hit.page}  {when}\n    {hit.snippet}")
+            print(f"{len(hits)} slides in {elapsed:.1f} ms")
+        elif args.command == "info":
+            stats = index.stats()
+            print(f"{stats['sessions']} sessions, {stats['slides']} slides")
+        else:
+            index.forget(os.path.abspath(args.directory))
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import io
+import mmap
+import os
+import struct
+import threading
+from PIL import Image
+
+STORE_EXTENSION = ".ssn"
+STORE_MAGIC = b"SLIDESNAP-FRAMES-1\n"
+# Index entry: data offset, length, file extension (e.g. b".png", NUL padded)
+_ENTRY = struct.Struct("<QI8s")
+
+class SessionStore:
+    """Append-only container holding a session's encoded frames in one file.
+
+    Frames are appended to <name>.ssn and located through a fixed-size
+    offset index in <name>.ssn.idx, which is written after each frame's
+    data, so an interrupted session loses at most its last frame. Reads go
+    through a memory map of the data file; a reader notices frames appended
+    after it was opened.
+
+    Frames are referenced elsewhere (the journal, PDFCompiler) as
+    "<path>.ssn#<index>"; open_frame() and read_frame_bytes() accept these
+    references as well as ordinary file paths.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.append_mode = append
+        self._lock = threading.Lock()
+        self._entries = []
+        self._map = None
+        self._map_size = 0
+        if append:
+            new = not os.path.exists(path)
+            self._data = open(path, "ab")
+            self._index = open(self.index_path, "ab")
+            if new:
+                self._data.write(STORE_MAGIC)
+                self._data.flush()
+        else:
+            self._data = None
+            self._index = None
+        self._load_index()
+
+    def _load_index(self):
+        """Read index entries added since the last call, ignoring a torn tail."""
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(len(self._entries) * _ENTRY.size)
+                raw = f.read()
+        except OSError:
+            return
+        data_size = os.path.getsize(self.path)
+        for start in range(0, len(raw) - _ENTRY.size + 1, _ENTRY.size):
+            offset, length, extension = _ENTRY.unpack_from(raw, start)
+            if offset + length > data_size:
+                break  # Data for this entry never reached the disk
+            self._entries.append((offset, length, extension.rstrip(b"\0").decode()))
+
+    def __len__(self):
+        with self._lock:
+            if not self.append_mode:
+                self._load_index()
+            return len(self._entries)
+
+    def append(self, data, extension=".png"):
+        """Append one encoded frame and return its index."""
+        with self._lock:
+            offset = self._data.tell()
+            self._data.write(data)
+            self._data.flush()
+            self._index.write(_ENTRY.pack(offset, len(data), extension.encode()))
+            self._index.flush()
+            self._entries.append((offset, len(data), extension))
+            return len(self._entries) - 1
+
+    def ref(self, index):
+        return f"{self.path}#{index}"
+
+    def extension(self, index):
+        return self._entry(index)[2]
+
+    def read(self, index):
+        """Return the encoded bytes of frame index."""
+        offset, length, _ = self._entry(index)
+        with self._lock:
+            if self._map is None or offset + length > self._map_size:
+                self._remap()
+            return self._map[offset:offset + length]
+
+    def open_image(self, index):
+        return Image.open(io.BytesIO(self.read(index)))
+
+    def _entry(self, index):
+        with self._lock:
+            if index >= len(self._entries) and not self.append_mode:
+                self._load_index()
+            return self._entries[index]
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map_size = len(self._map)
+
+    def export(self, output_dir, prefix="screenshot_"):
+        """Write every frame out as a loose PNG and return the paths."""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for index in range(len(self)):
+            path = os.path.join(output_dir, f"{prefix}{index:06d}.png")
+            if self.extension(index) == ".png":
+                with open(path, "wb") as f:
+                    f.write(self.read(index))
+            else:
+                with self.open_image(index) as img:
+                    img.convert("RGB").save(path, format="PNG")
+            paths.append(path)
+        return paths
+
+    def close(self):
+        with self._lock:
+            for handle in (self._data, self._index, self._map):
+                if handle is not None:
+                    handle.close()
+            self._data = self._index = self._map = None
+
+_readers = {}  # Per-process read-only stores, keyed by path
+
+def parse_ref(ref):
+    """Split "<store>.ssn#<index>" into (store path, index), or return None."""
+    path, sep, index = ref.rpartition("#")
+    if sep and path.endswith(STORE_EXTENSION) and index.isdigit():
+        return path, int(index)
+    return None
+
+def _reader(path):
+    store = _readers.get(path)
+    if store is None:
+        store = _readers[path] = SessionStore(path)
+    return store
+
+def open_frame(ref):
+    """Open a frame by file path or store reference as a PIL image."""
+    parsed = parse_ref(ref)
+    if parsed is None:
+        return Image.open(ref)
+    path, index = parsed
+    return _reader(path).open_image(index)
+
+def read_frame_bytes(ref):
+    """Encoded bytes of a frame, by file path or store reference."""
+    parsed = parse_ref(ref)
+    if parsed is None:
+        with open(ref, "rb") as f:
+            return f.read()
+    path, index = parsed
+    return _reader(path).read(index)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or export a SlideSnap session store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="write every frame out as a PNG file")
+    export.add_argument("store", help="path to a frames.ssn file")
+    export.add_argument("output_dir")
+    info = sub.add_parser("info", help="print the number of frames and their total size")
+    info.add_argument("store")
+    args = parser.parse_args(argv)
+
+    store = SessionStore(args.store)
+    try:
+        if args.command == "export":
+            paths = store.export(args.output_dir)
+            print(f"Exported {len(paths)} frames to {args.output_dir}")
+        else:
+            total = sum(store._entry(i)[1] for i in range(len(store)))
+            print(f"{len(store)} frames, {total / 1e6:.1f} MB")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.utils.change_detector import ChangeDetector
+
+THRESHOLD = 500
+
+def float_mse_differs(a, b, ignore=None):
+    """The original full-frame float64 MSE decision."""
+    diff = (a.astype(np.float64) - b.astype(np.float64)) ** 2
+    if ignore is not None:
+        diff = diff[~ignore]
+    return diff.size > 0 and float(diff.mean()) > THRESHOLD
+
+def base_frame():
+    rng = np.random.default_rng(7)
+    frame = np.full((480, 640, 3), 240, np.uint8)
+    frame[40:80, 40:600] = rng.integers(0, 60, (40, 560, 3), dtype=np.uint8)  # a title bar
+    return frame
+
+def sparse_lines(frame, offset, every):
+    changed = frame.copy()
+    changed[offset::every] = 0
+    return changed
+
+def off_grid_pixels(frame):
+    changed = frame.copy()
+    changed[1::4, 1::2] = 255 - changed[1::4, 1::2]
+    return changed
+
+def text_edit(frame, height):
+    changed = frame.copy()
+    changed[300:300 + height, 100:400] = 0
+    return changed
+
+def noise(frame, amplitude):
+    rng = np.random.default_rng(3)
+    jitter = rng.integers(-amplitude, amplitude + 1, frame.shape)
+    return np.clip(frame.astype(np.int16) + jitter, 0, 255).astype(np.uint8)
+
+CASES = {
+    "identical": lambda f: f.copy(),
+    "lines_every_4_offset_1": lambda f: sparse_lines(f, 1, 4),
+    "lines_every_4_on_grid": lambda f: sparse_lines(f, 0, 4),
+    "lines_every_16_on_grid": lambda f: sparse_lines(f, 0, 16),
+    "lines_every_64": lambda f: sparse_lines(f, 3, 64),
+    "off_grid_pixels": off_grid_pixels,
+    "small_text_edit": lambda f: text_edit(f, 8),
+    "large_text_edit": lambda f: text_edit(f, 60),
+    "noise_6": lambda f: noise(f, 6),
+    "noise_40": lambda f: noise(f, 40),
+}
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_matches_float_mse(case):
+    a = base_frame()
+    b = CASES[case](a)
+    assert ChangeDetector(THRESHOLD).is_different(a, b) == float_mse_differs(a, b)
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_matches_float_mse_with_ignore_mask(case):
+    a = base_frame()
+    b = CASES[case](a)
+    ignore = np.zeros(a.shape[:2], dtype=bool)
+    ignore[:, 500:] = True
+    detector = ChangeDetector(THRESHOLD)
+    detector.set_ignore_mask(ignore)
+    assert detector.is_different(a, b) == float_mse_differs(a, b, ignore)
+
+def test_strided_bgra_view_matches_float_mse():
+    a = base_frame()
+    b = sparse_lines(a, 1, 4)
+    # Captures are views over a BGRA buffer that skip the alpha byte
+    bgra = np.zeros((2,) + a.shape[:2] + (4,), np.uint8)
+    bgra[0, :, :, :3] = a
+    bgra[1, :, :, :3] = b
+    assert ChangeDetector(THRESHOLD).is_different(bgra[0, :, :, :3], bgra[1, :, :, :3]) == float_mse_differs(a, b)
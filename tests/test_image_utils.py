@@ -0,0 +1,18 @@
+import gc
+
+from PyQt6.QtGui import QImage, QColor
+from src.utils.image_utils import qimage_to_frame
+
+def test_pixels_outlive_their_frame():
+    for fmt in (QImage.Format.Format_RGB32, QImage.Format.Format_RGB888):
+        image = QImage(1201, 900, fmt)
+        image.fill(QColor(10, 20, 30))
+        frame = qimage_to_frame(image)
+        pixels = frame.pixels
+        cropped = frame.crop(100, 50, 200, 100)
+        del image, frame
+        gc.collect()
+        # The views alone must keep the grab buffer alive
+        assert pixels.shape == (900, 1201, 3)
+        assert int(pixels.sum()) == (10 + 20 + 30) * 1201 * 900
+        assert cropped.to_image().getpixel((0, 0)) == (10, 20, 30)
@@ -0,0 +1,32 @@
+import gc
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QImage, QColor
+from src.core.monitor import ScreenMonitor
+from src.utils.image_utils import qimage_to_frame
+
+# Large enough that a freed grab buffer is returned to the OS, so reading
+# it through a dangling view crashes instead of returning stale pixels
+SIZE = (1200, 900)
+
+def grabbed_frame(shade):
+    """A Frame viewing a QImage buffer, as a live screen grab produces."""
+    image = QImage(SIZE[0], SIZE[1], QImage.Format.Format_RGB32)
+    image.fill(QColor(shade, shade, shade))
+    return qimage_to_frame(image)
+
+def test_process_frame_keeps_grab_buffers_alive(tmp_path):
+    monitor = ScreenMonitor()
+    monitor.begin_session(pdf_enabled=False, pdf_directory=str(tmp_path))
+    monitor.open_capture()
+    try:
+        # A change starts a transition; the debouncer compares each later
+        # tick against the previous one after the monitor has dropped it
+        for tick, shade in enumerate([0, 255, 255, 255, 255, 0, 0, 0, 0]):
+            monitor.process_frame(grabbed_frame(shade), tick * 0.25)
+            gc.collect()
+    finally:
+        monitor.close_capture()
+    assert len(monitor.get_captured_images()) == 2
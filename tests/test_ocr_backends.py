@@ -0,0 +1,17 @@
+from src.core.ocr_backends import OCRResult, OCRWord
+
+def word(text, left, top, width=40, height=20):
+    return OCRWord(text, left, top, width, height, 90)
+
+def test_lines_group_words_by_row():
+    result = OCRResult(400, 300, [
+        word("Quarterly", 10, 10), word("results", 60, 12),
+        word("Revenue", 10, 50), word("up", 60, 48), word("4%", 90, 51),
+        # Same row as the line above, but back at the left margin: a new line
+        word("Next", 10, 52),
+    ])
+    assert [[w.text for w in line] for line in result.lines()] == [
+        ["Quarterly", "results"], ["Revenue", "up", "4%"], ["Next"]]
+
+def test_lines_of_empty_result():
+    assert OCRResult(400, 300).lines() == []